@@ -19,12 +19,27 @@
 
 import time
 import json
+import pickle
+import hashlib
 import os
 import sys
 import logging
-import traceback
+import threading
+import math
+import random
+import mmap
+import gzip
+import glob
+import shutil
+import re
 import argparse
-from collections import defaultdict
+import asyncio
+import signal
+import queue
+from collections import defaultdict, deque
+from itertools import chain
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from typing import Set, Dict, List, Any
 
@@ -35,22 +50,63 @@ try:
     from solders.signature import Signature
     from solana.rpc.api import Client
     from solana.rpc.types import TxOpts
-    from solana.exceptions import SolanaRpcException
+    import httpx
     from httpx import HTTPStatusError
+    from solders.rpc.responses import GetSignaturesForAddressResp
     from spl.token.instructions import get_associated_token_address, freeze_account, FreezeAccountParams, thaw_account, ThawAccountParams
     from spl.token.constants import TOKEN_PROGRAM_ID
     from solders.transaction import Transaction
-    from pyvis.network import Network
 except ImportError as e:
     print(f"Fehler: Eine oder mehrere erforderliche Bibliotheken fehlen: {e}.")
-    print("Bitte installieren Sie diese mit: pip install solders solana spl-token pyvis httpx")
+    print("Bitte installieren Sie diese mit: pip install solders solana spl-token httpx")
     sys.exit(1)
 
+# orjson ist optional: deutlich schnelleres Parsen/Serialisieren der JSONL-Logs.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# zstandard ist optional: kleinere und schneller lesbare Log-Segmente (Fallback: gzip).
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# h2 ist optional: HTTP/2 multiplext alle parallelen Batch-Requests über eine Verbindung pro Endpunkt.
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# networkx ist optional: Layout großer Graphen serverseitig statt per Browser-Physik.
+try:
+    import networkx as nx
+except ImportError:
+    nx = None
+
+# msgspec ist optional: Log-Zeilen werden direkt in typisierte Structs dekodiert (ohne Zwischen-Dict).
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+def json_loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_dumps(obj) -> str:
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+def json_dumpb(obj) -> bytes:
+    # orjson liefert direkt UTF-8-Bytes; spart Dekodieren und erneutes Kodieren beim Schreiben.
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode()
+
 # --- Konfiguration ---
 def load_config():
     try:
-        with open("config.json", 'r') as f:
-            return json.load(f)
+        with open("config.json", 'rb') as f:
+            return json_loads(f.read())
     except FileNotFoundError:
         print("FEHLER: config.json nicht gefunden. Bitte erstellen Sie die Datei mit 'rpc_url' und 'wallet_folder'.")
         return None
@@ -63,16 +119,27 @@ if not CONFIG:
     sys.exit(1)
 
 RPC_URL = CONFIG.get("rpc_url")
+# Optionale Zusatz-Endpunkte für gehedgte Batch-Anfragen; rpc_url bleibt der Standard-Endpunkt.
+RPC_URLS = [RPC_URL] + [u for u in CONFIG.get("rpc_urls", []) if u != RPC_URL]
 WALLET_FOLDER = CONFIG.get("wallet_folder")
 
 # --- Dateipfade im Unterordner "analyse" ---
 ANALYSE_FOLDER = "analyse"
 STATE_FILE = os.path.join(ANALYSE_FOLDER, "last_signatures.json")
+PROCESSED_SIGS_FILE = os.path.join(ANALYSE_FOLDER, "processed_signatures.pkl")
 GREYLIST_FILE = os.path.join(ANALYSE_FOLDER, "greylist.json")
 TRANSACTION_LOG_FILE = os.path.join(ANALYSE_FOLDER, "transactions.jsonl")
 VISUALIZATION_FILE = os.path.join(ANALYSE_FOLDER, "network_visualization.html")
 MAIN_LOG_FILE = os.path.join(ANALYSE_FOLDER, "checker_main.log")
+LOG_CACHE_FILE = os.path.join(ANALYSE_FOLDER, "vis_cache.pkl")
+VIS_META_FILE = os.path.join(ANALYSE_FOLDER, "viz.meta")
+STATIC_LAYOUT_THRESHOLD = CONFIG.get("vis_static_layout_threshold", 1000)
 TOKEN_DECIMALS = 9
+TOKEN_BASE_UNITS = 10**TOKEN_DECIMALS
+LOG_CACHE_VERSION = 3
+# Ab dieser Größe wird das (bereits aggregierte) Transaktions-Log in ein komprimiertes Segment ausgelagert.
+LOG_ROTATE_BYTES = int(CONFIG.get("log_rotate_mb", 64) * 1024 * 1024)
+LOG_HEAD_BYTES = 256
 
 # --- Logging Setup ---
 def setup_logger(name, log_file, level=logging.INFO, debug_mode=False):
@@ -101,468 +168,1155 @@ def setup_logger(name, log_file, level=logging.INFO, debug_mode=False):
 
 main_logger = logging.getLogger('main_checker')
 
-transaction_logger = logging.getLogger('transaction_logger')
-if not transaction_logger.hasHandlers():
-    transaction_logger.setLevel(logging.INFO)
-    os.makedirs(os.path.dirname(TRANSACTION_LOG_FILE), exist_ok=True)
-    jsonl_handler = logging.FileHandler(TRANSACTION_LOG_FILE, mode='a', encoding='utf-8')
-    transaction_logger.addHandler(jsonl_handler)
-    transaction_logger.propagate = False
-
 # --- Hilfsfunktionen ---
 def load_keypair(filename: str):
     path = os.path.join(WALLET_FOLDER, filename)
     if not os.path.exists(path):
         raise FileNotFoundError(f"Wallet-Datei '{path}' nicht gefunden.")
-    with open(path, 'r') as f:
-        return Keypair.from_bytes(bytes(json.load(f)))
+    with open(path, 'rb') as f:
+        return Keypair.from_bytes(bytes(json_loads(f.read())))
+
+_whitelist_cache: Dict[str, Any] = {'key': None, 'wallets': frozenset()}
 
-def load_whitelist() -> set:
+def _drop_invalid_addresses(addresses, source: str) -> list:
+    """Verwirft Einträge, die keine gültige Base58-Adresse sind, damit ein Tippfehler nicht jeden Lauf abbricht."""
+    valid = []
+    for address in addresses:
+        try:
+            Pubkey.from_string(address)
+        except (ValueError, TypeError):
+            main_logger.error("Ungültige Adresse in %s wird ignoriert: %r", source, address)
+            continue
+        valid.append(address)
+    return valid
+
+def load_whitelist() -> frozenset:
+    """Liest whitelist.txt; unveränderte Dateien (mtime/Größe) werden nicht erneut geparst."""
     path = os.path.join(WALLET_FOLDER, "whitelist.txt")
-    if not os.path.exists(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
         main_logger.warning("whitelist.txt nicht gefunden, leere Whitelist wird verwendet.")
-        return set()
-    with open(path, 'r', encoding='utf-8') as f:
-        return {line.strip() for line in f if line.strip() and not line.startswith('#')}
+        return frozenset()
+    key = (st.st_mtime_ns, st.st_size)
+    if _whitelist_cache['key'] != key:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        _whitelist_cache['wallets'] = frozenset(_drop_invalid_addresses(entries, "whitelist.txt"))
+        _whitelist_cache['key'] = key
+    return _whitelist_cache['wallets']
 
 def load_greylist() -> set:
     if not os.path.exists(GREYLIST_FILE):
         return set()
     try:
-        with open(GREYLIST_FILE, 'r') as f:
-            return set(json.load(f))
+        with open(GREYLIST_FILE, 'rb') as f:
+            return set(_drop_invalid_addresses(json_loads(f.read()), GREYLIST_FILE))
     except (json.JSONDecodeError, TypeError):
-        main_logger.error(f"{GREYLIST_FILE} ist korrupt. Eine neue Greylist wird erstellt.")
+        main_logger.error("%s ist korrupt. Eine neue Greylist wird erstellt.", GREYLIST_FILE)
         return set()
 
+def _write_json_file(path: str, data):
+    if orjson:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+
 def save_greylist(greylist_data: set):
-    with open(GREYLIST_FILE, 'w') as f:
-        json.dump(sorted(list(greylist_data)), f, indent=4)
+    _write_json_file(GREYLIST_FILE, sorted(greylist_data))
 
 def load_state():
     if not os.path.exists(STATE_FILE):
         return {}
     try:
-        with open(STATE_FILE, 'r') as f:
-            return json.load(f)
+        with open(STATE_FILE, 'rb') as f:
+            return json_loads(f.read())
     except json.JSONDecodeError:
-        main_logger.error(f"{STATE_FILE} ist korrupt. Ein neuer Status wird erstellt.")
+        main_logger.error("%s ist korrupt. Ein neuer Status wird erstellt.", STATE_FILE)
         return {}
 
 def save_state(state):
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f, indent=4)
+    _write_json_file(STATE_FILE, state)
+
+def load_processed_signatures() -> set:
+    """Menge bereits analysierter Signaturen (rohe 64 Bytes) aus früheren Läufen."""
+    if not os.path.exists(PROCESSED_SIGS_FILE):
+        return set()
+    try:
+        with open(PROCESSED_SIGS_FILE, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        main_logger.warning("%s ist korrupt. Bereits analysierte Signaturen werden nicht übersprungen.", PROCESSED_SIGS_FILE)
+        return set()
+
+def save_processed_signatures(processed: set):
+    tmp_file = PROCESSED_SIGS_FILE + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(processed, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, PROCESSED_SIGS_FILE)
+
+def _state_last_sig(state_entry) -> str | None:
+    return state_entry.get('last_sig') if isinstance(state_entry, dict) else state_entry
+
+# Beträge wiederholen sich stark (Standardbeträge, Salden 0); Knoten und Kanten teilen sich die Formatierung.
+@lru_cache(maxsize=65536)
+def format_token_amount(amount_raw: int) -> str:
+    """Formatiert einen Betrag in Basiseinheiten erst bei der Ausgabe (4 Nachkommastellen, reine Ganzzahl-Arithmetik)."""
+    # Ohne Umweg über float bleiben auch große Summen exakt.
+    scaled = (abs(amount_raw) * 10_000 + TOKEN_BASE_UNITS // 2) // TOKEN_BASE_UNITS
+    whole, frac = divmod(scaled, 10_000)
+    text = f"{whole}.{frac:04d}".rstrip('0').rstrip('.') if frac else str(whole)
+    return "-" + text if amount_raw < 0 and scaled else text
 
 def truncate_address(address: str, chars: int = 4) -> str:
     if not isinstance(address, str) or len(address) < chars * 2: return address
     return f"{address[:chars]}...{address[-chars:]}"
 
+# --- Aggregation des Transaktions-Logs ---
+def _empty_log_aggregates() -> dict:
+    return {'all_wallets': set(), 'balances': defaultdict(int), 'flows': defaultdict(int), 'sent': defaultdict(int), 'freeze_status': {}}
+
+STATUS_TRANSFER = frozenset({'VIOLATION', 'AUTHORIZED_TRANSFER'})
+STATUS_FREEZE = frozenset({'ACCOUNT_FROZEN', 'ACCOUNT_FROZEN_BY_SCRIPT'})
+STATUS_THAW = frozenset({'ACCOUNT_THAWED'})
+
+def _apply_log_entry(aggregates: dict, status: str | None, timestamp: str, sender: str | None, recipient: str | None,
+                     amount: int | None, frozen_wallet: str | None, thawed_wallet: str | None):
+    if status in STATUS_TRANSFER:
+        if sender and recipient and amount and amount > 0 and "Multiple" not in sender:
+            aggregates['all_wallets'].update([sender, recipient])
+            aggregates['balances'][sender] -= amount
+            aggregates['balances'][recipient] += amount
+            aggregates['flows'][(sender, recipient)] += amount
+            aggregates['sent'][sender] += amount
+        return
+    if status in STATUS_FREEZE:
+        wallet, freeze_state = frozen_wallet, 'FROZEN'
+    elif status in STATUS_THAW:
+        wallet, freeze_state = thawed_wallet, 'THAWED'
+    else:
+        return
+
+    # Salden und Flüsse sind reihenfolgeunabhängig, für Freeze/Thaw zählt pro Wallet
+    # nur das Ereignis mit dem jüngsten Zeitstempel.
+    if wallet:
+        aggregates['all_wallets'].add(wallet)
+        previous = aggregates['freeze_status'].get(wallet)
+        if previous is None or timestamp >= previous['timestamp']:
+            aggregates['freeze_status'][wallet] = {'status': freeze_state, 'timestamp': timestamp}
+
+def _raw_amount(amount_raw: int | None, amount: float | None) -> int:
+    # Ältere Einträge enthalten nur den skalierten Betrag als Float.
+    return amount_raw if amount_raw is not None else round((amount or 0) * TOKEN_BASE_UNITS)
+
+def _apply_log_dict(aggregates: dict, tx: dict):
+    _apply_log_entry(aggregates, tx.get('status'), tx.get('timestamp', ''), tx.get('sender'), tx.get('recipient'),
+                     _raw_amount(tx.get('amount_raw'), tx.get('amount')), tx.get('frozen_wallet'), tx.get('thawed_wallet'))
+
+if msgspec is not None:
+    class LogEntry(msgspec.Struct):
+        status: str | None = None
+        timestamp: str = ''
+        sender: str | None = None
+        recipient: str | None = None
+        amount_raw: int | None = None
+        amount: float | None = None
+        frozen_wallet: str | None = None
+        thawed_wallet: str | None = None
+
+    _LOG_DECODER = msgspec.json.Decoder(LogEntry)
+
+    def _apply_log_line(aggregates: dict, line: bytes):
+        e = _LOG_DECODER.decode(line)
+        _apply_log_entry(aggregates, e.status, e.timestamp, e.sender, e.recipient,
+                         _raw_amount(e.amount_raw, e.amount), e.frozen_wallet, e.thawed_wallet)
+elif orjson is None:
+    # Transfer-Zeilen schreibt _log_event immer in derselben Feldreihenfolge; für sie genügt ein
+    # vorkompiliertes Muster statt eines vollständigen JSON-Objekts (etwa 3x schneller als json.loads,
+    # orjson ist dagegen schneller als das Muster). Alles andere geht über json_loads.
+    _TRANSFER_LINE = re.compile(
+        rb'\{"timestamp":\s*"([^"]*)",\s*"signature":\s*"[^"]*",\s*"status":\s*"(VIOLATION|AUTHORIZED_TRANSFER)",\s*'
+        rb'"sender":\s*"([^"]*)",\s*"recipient":\s*"([^"]*)",\s*"amount":\s*[-+.\deE]+,\s*"amount_raw":\s*(\d+)\}\s*')
+
+    def _apply_log_line(aggregates: dict, line: bytes):
+        m = _TRANSFER_LINE.fullmatch(line)
+        if m:
+            timestamp, status, sender, recipient, amount_raw = m.groups()
+            _apply_log_entry(aggregates, status.decode(), timestamp.decode(), sender.decode(), recipient.decode(),
+                             int(amount_raw), None, None)
+            return
+        _apply_log_dict(aggregates, json_loads(line))
+else:
+    def _apply_log_line(aggregates: dict, line: bytes):
+        _apply_log_dict(aggregates, json_loads(line))
+
+def _replay_rotated_logs(aggregates: dict, log_file: str):
+    """Liest ausgelagerte Segmente (und ein evtl. unterbrochen rotiertes Log) vollständig ein."""
+    paths = sorted(glob.glob(log_file + ".*.gz") + glob.glob(log_file + ".*.zst"))
+    if os.path.exists(log_file + ".rotating"): paths.append(log_file + ".rotating")
+    for path in paths:
+        if path.endswith(".zst"):
+            if zstandard is None:
+                main_logger.error("Segment %s kann ohne zstandard nicht gelesen werden (pip install zstandard).", path)
+                continue
+            opener = zstandard.open
+        else:
+            opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, 'rb') as f:
+            for line in f:
+                try:
+                    _apply_log_line(aggregates, line)
+                except Exception:
+                    continue
+
+def _save_log_cache(cache: dict):
+    try:
+        # Atomar ersetzen, damit ein Abbruch beim Schreiben keinen halben Cache hinterlässt.
+        tmp_file = LOG_CACHE_FILE + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, LOG_CACHE_FILE)
+    except OSError as e:
+        main_logger.error("Fehler beim Speichern des Log-Caches: %s", e)
+
+def _rotate_log(log_file: str, aggregates: dict):
+    """Lagert das vollständig aggregierte Log als zstd- bzw. gzip-Segment aus; der Writer legt beim nächsten Event eine neue Datei an."""
+    rotating = log_file + ".rotating"
+    os.replace(log_file, rotating)
+    # inode None: Der Cache gilt ab jetzt für die nächste Log-Datei ab Offset 0.
+    _save_log_cache({'version': LOG_CACHE_VERSION, 'inode': None, 'size': 0, 'offset': 0, 'aggregates': aggregates})
+    segment = f"{log_file}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.{'zst' if zstandard else 'gz'}"
+    if zstandard:
+        with open(rotating, 'rb') as src, open(segment + ".tmp", 'wb') as dst:
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+    else:
+        with open(rotating, 'rb') as src, gzip.open(segment + ".tmp", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+    os.replace(segment + ".tmp", segment)
+    os.remove(rotating)
+    main_logger.info("Transaktions-Log rotiert: %s", segment)
+
+def load_log_aggregates(log_file: str) -> dict:
+    """Aggregiert das Transaktions-Log inkrementell.
+
+    Die Zwischenstände werden mit Inode und Byte-Offset in LOG_CACHE_FILE abgelegt,
+    sodass bei jedem Aufruf nur die seit dem letzten Lauf angehängten Zeilen geparst werden.
+    Rotierte Segmente (zstd/gzip) werden nur gelesen, wenn der Cache neu aufgebaut werden muss.
+    """
+    cache = None
+    if os.path.exists(LOG_CACHE_FILE):
+        try:
+            with open(LOG_CACHE_FILE, 'rb') as f:
+                cache = pickle.load(f)
+        except Exception:
+            main_logger.warning("%s ist korrupt. Das Log wird vollständig neu eingelesen.", LOG_CACHE_FILE)
+    if cache and cache.get('version') != LOG_CACHE_VERSION: cache = None
+
+    if not os.path.exists(log_file):
+        if cache and cache.get('inode') is None: return cache['aggregates']
+        aggregates = _empty_log_aggregates()
+        _replay_rotated_logs(aggregates, log_file)
+        _save_log_cache({'version': LOG_CACHE_VERSION, 'inode': None, 'size': 0, 'offset': 0, 'aggregates': aggregates})
+        return aggregates
+
+    with open(log_file, 'rb') as f:
+        st = os.fstat(f.fileno())
+        # Die ersten Bytes des Logs sichern den Checkpoint gegen ein neu geschriebenes Log mit gleichem Inode ab.
+        head = f.read(LOG_HEAD_BYTES)
+        if (cache and cache.get('inode') in (st.st_ino, None) and cache.get('offset', 0) <= st.st_size
+                and head.startswith(cache.get('head', b''))):
+            aggregates, offset = cache['aggregates'], cache['offset']
+        else:
+            aggregates, offset = _empty_log_aggregates(), 0
+            _replay_rotated_logs(aggregates, log_file)
+
+        if offset == st.st_size and cache and cache.get('inode') == st.st_ino and st.st_size < LOG_ROTATE_BYTES:
+            return aggregates
+
+        # mmap statt zeilenweisem Datei-Iterator: Zeilenenden werden per find() auf den
+        # gemappten Seiten gesucht, ohne Python-seitige Zeilenpufferung.
+        if offset < st.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while True:
+                    end = mm.find(b'\n', offset)
+                    # Eine unvollständige letzte Zeile wird erst im nächsten Lauf verarbeitet.
+                    if end == -1: break
+                    line, offset = mm[offset:end], end + 1
+                    try:
+                        _apply_log_line(aggregates, line)
+                    except Exception:
+                        continue
+
+    # Rotiert wird nur ein vollständig aggregiertes Log (keine angefangene letzte Zeile).
+    if offset == st.st_size and st.st_size >= LOG_ROTATE_BYTES and not os.path.exists(log_file + ".rotating"):
+        try:
+            _rotate_log(log_file, aggregates)
+            return aggregates
+        except OSError as e:
+            main_logger.error("Fehler beim Rotieren des Transaktions-Logs: %s", e)
+    _save_log_cache({'version': LOG_CACHE_VERSION, 'inode': st.st_ino, 'size': st.st_size, 'offset': offset,
+                     'head': head[:offset], 'aggregates': aggregates})
+    return aggregates
+
 # --- Visualisierung ---
+# Statische Seite statt pyvis/jinja2: pro Lauf werden nur die JSON-Daten eingesetzt.
+VIS_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Token-Netzwerk</title>
+<script src="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js"></script>
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css">
+<style>body{margin:0;background:#222222;color:white}#network{width:100%;height:95vh;background:#222222}</style>
+</head>
+<body>
+<div id="network"></div>
+<script>
+// vis-network zeigt String-Tooltips als Klartext; HTML-Tooltips müssen als Element übergeben werden.
+function htmlTitle(item) {
+  if (typeof item.title === "string") { const el = document.createElement("div"); el.innerHTML = item.title; item.title = el; }
+  return item;
+}
+const nodes = new vis.DataSet(__NODES__.map(htmlTitle));
+const edges = new vis.DataSet(__EDGES__.map(htmlTitle));
+new vis.Network(document.getElementById("network"), {nodes: nodes, edges: edges}, __OPTIONS__);
+</script>
+</body>
+</html>
+"""
+VIS_OPTIONS = json.loads("""
+{"nodes":{"font":{"size":14,"color":"#FFFFFF"}},"edges":{"arrows":{"to":{"enabled":true,"scaleFactor":0.7}},"color":{"inherit":false,"color":"#848484","highlight":"#FFFFFF","hover":"#FFFFFF"},"font":{"size":12,"color":"#FFFFFF","align":"top"},"smooth":{"type":"continuous"}},"physics":{"barnesHut":{"gravitationalConstant":-80000,"centralGravity":0.3,"springLength":400,"springConstant":0.09,"damping":0.09,"avoidOverlap":1},"minVelocity":0.75,"solver":"barnesHut"},"interaction":{"tooltipDelay":200,"hideEdgesOnDrag":true,"hover":true}}
+""")
+
+def _script_json(data) -> str:
+    # "</" im Tooltip-HTML würde sonst den <script>-Block beenden.
+    return json_dumps(data).replace("</", "<\\/")
+
+def compute_static_layout(node_ids: list, edges) -> dict:
+    """Berechnet feste Knotenpositionen (spring_layout, ohne networkx ein Kreis-Layout)."""
+    scale = 100 * math.sqrt(len(node_ids))
+    if nx is not None:
+        graph = nx.Graph()
+        graph.add_nodes_from(node_ids)
+        graph.add_edges_from(edges)
+        positions = nx.spring_layout(graph, seed=42, scale=scale)
+        return {n: (float(x), float(y)) for n, (x, y) in positions.items()}
+    step = 2 * math.pi / max(1, len(node_ids))
+    return {n: (scale * math.cos(i * step), scale * math.sin(i * step)) for i, n in enumerate(sorted(node_ids))}
+
+WALLET_EXTERN, WALLET_WHITELIST, WALLET_GREYLIST, WALLET_PAYER = range(4)
+WALLET_STYLES = {
+    WALLET_EXTERN: ('#848484', 'Extern'),
+    WALLET_WHITELIST: ('#22C55E', 'Whitelist'),
+    WALLET_GREYLIST: ('#FBBF24', 'Greylist'),
+    WALLET_PAYER: ('#A855F7', 'Payer'),
+}
+
 class NetworkVisualizer:
     def __init__(self, log_file: str, whitelist: set, greylist: set, payer_address: str):
         self.log_file = log_file
         self.whitelist = whitelist
         self.greylist = greylist
         self.payer_address = payer_address
+        # Einmalige Zuordnung Adresse -> (Farbe, Status-Text) (Priorität: Payer > Whitelist > Greylist).
+        self._styles = dict.fromkeys(greylist, WALLET_STYLES[WALLET_GREYLIST])
+        self._styles.update(dict.fromkeys(whitelist, WALLET_STYLES[WALLET_WHITELIST]))
+        self._styles[payer_address] = WALLET_STYLES[WALLET_PAYER]
+
+    def _render_key(self) -> dict:
+        # Der Graph hängt vom Log-Inhalt und von der Wallet-Einstufung (Farben) ab.
+        # Nach einer Rotation fehlt die Log-Datei, bis das nächste Event geschrieben wird.
+        st = os.stat(self.log_file) if os.path.exists(self.log_file) else os.stat_result((0,) * 10)
+        lists = "\n".join(sorted(self.whitelist)) + "|" + "\n".join(sorted(self.greylist)) + "|" + self.payer_address
+        return {'log_size': st.st_size, 'log_mtime': st.st_mtime, 'lists_hash': hashlib.sha1(lists.encode()).hexdigest()}
 
-    def generate_graph(self):
-        if not os.path.exists(self.log_file):
+    def generate_graph(self, aggregates: dict | None = None):
+        """Rendert den Graphen; bereits geladene Log-Aggregate können übergeben werden."""
+        if not os.path.exists(self.log_file) and not os.path.exists(LOG_CACHE_FILE):
             main_logger.info("Keine Log-Datei für Visualisierung gefunden. Überspringe.")
             return
 
-        all_wallets = set()
-        balances = defaultdict(float)
-        flows = defaultdict(float)
-        wallet_freeze_status = {}
+        render_key = self._render_key()
+        try:
+            with open(VIS_META_FILE, 'rb') as f:
+                if json_loads(f.read()) == render_key and os.path.exists(VISUALIZATION_FILE):
+                    main_logger.info("Visualisierung up-to-date.")
+                    return
+        except (OSError, ValueError):
+            pass
 
-        log_entries = []
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    log_entries.append(json.loads(line))
-                except (json.JSONDecodeError, IndexError):
-                    continue
+        if aggregates is None: aggregates = load_log_aggregates(self.log_file)
+        if not aggregates['all_wallets']:
+            main_logger.info("Keine Transaktionsdaten für Visualisierung vorhanden. Überspringe.")
+            return
 
-        log_entries.sort(key=lambda x: x.get('timestamp', ''))
+        all_wallets = set(aggregates['all_wallets'])
+        balances = aggregates['balances']
+        flows = aggregates['flows']
+        wallet_freeze_status = aggregates['freeze_status']
 
-        for tx in log_entries:
-            try:
-                status = tx.get('status')
-                timestamp = tx.get('timestamp')
-
-                if status in ['VIOLATION', 'AUTHORIZED_TRANSFER']:
-                    sender, recipient = tx.get('sender'), tx.get('recipient')
-                    amount = tx.get('amount', 0)
-                    if sender and recipient and amount > 0 and "Multiple" not in sender:
-                        all_wallets.update([sender, recipient])
-                        balances[sender] -= amount
-                        balances[recipient] += amount
-                        flows[(sender, recipient)] += amount
-                
-                wallet = None
-                if 'FROZEN' in status:
-                    wallet = tx.get('frozen_wallet')
-                    wallet_freeze_status[wallet] = {'status': 'FROZEN', 'timestamp': timestamp}
-                elif 'THAWED' in status:
-                    wallet = tx.get('thawed_wallet')
-                    wallet_freeze_status[wallet] = {'status': 'THAWED', 'timestamp': timestamp}
-                
-                if wallet: all_wallets.add(wallet)
-
-            except Exception:
-                continue
-        
         final_frozen_wallets = {w for w, d in wallet_freeze_status.items() if d['status'] == 'FROZEN'}
         
-        net = Network(height="95vh", width="100%", bgcolor="#222222", font_color="white", notebook=False, directed=True)
-        
         all_wallets.add(self.payer_address)
+        styles, extern_style = self._styles, WALLET_STYLES[WALLET_EXTERN]
+        # Knoten und Kanten werden direkt als vis.js-Datensätze aufgebaut.
+        nodes = []
+        node_font = {'color': 'white'}
         for wallet in all_wallets:
-            color, status_text = '#848484', 'Extern'
-            if wallet == self.payer_address: color, status_text = '#A855F7', 'Payer'
-            elif wallet in self.whitelist: color, status_text = '#22C55E', 'Whitelist'
-            elif wallet in self.greylist: color, status_text = '#FBBF24', 'Greylist'
+            color, status_text = styles.get(wallet, extern_style)
             
             if wallet in final_frozen_wallets:
                 color = '#EF4444'
                 status_text += ' / Gesperrt'
 
-            balance_str = f"{balances[wallet]:.4f}".rstrip('0').rstrip('.')
+            balance_str = format_token_amount(balances.get(wallet, 0))
             title = (f"Wallet: {wallet}<br>"
                      f"<b>Berechneter Kontostand: {balance_str} Tokens</b><br>"
                      f"Status: {status_text}")
-            net.add_node(wallet, label=truncate_address(wallet), title=title, color=color)
+            # Adressen aus dem Log sind immer Strings: Kürzung inline statt truncate_address() pro Knoten.
+            label = wallet if len(wallet) < 8 else f"{wallet[:4]}...{wallet[-4:]}"
+            nodes.append({'id': wallet, 'label': label, 'shape': 'dot', 'title': title, 'color': color, 'font': node_font})
 
+        edges = []
         for (sender, recipient), total_amount in flows.items():
-            amount_str = f"{total_amount:.4f}".rstrip('0').rstrip('.')
-            title = f"Gesamtvolumen: {amount_str} Tokens"
-            net.add_edge(sender, recipient, title=title, label=amount_str, value=total_amount)
+            amount_str = format_token_amount(total_amount)
+            edges.append({'from': sender, 'to': recipient, 'arrows': 'to', 'title': f"Gesamtvolumen: {amount_str} Tokens",
+                          'label': amount_str, 'value': total_amount / TOKEN_BASE_UNITS})
 
-        net.set_options("""
-        {"nodes":{"font":{"size":14,"color":"#FFFFFF"}},"edges":{"arrows":{"to":{"enabled":true,"scaleFactor":0.7}},"color":{"inherit":false,"color":"#848484","highlight":"#FFFFFF","hover":"#FFFFFF"},"font":{"size":12,"color":"#FFFFFF","align":"top"},"smooth":{"type":"continuous"}},"physics":{"barnesHut":{"gravitationalConstant":-80000,"centralGravity":0.3,"springLength":400,"springConstant":0.09,"damping":0.09,"avoidOverlap":1},"minVelocity":0.75,"solver":"barnesHut"},"interaction":{"tooltipDelay":200,"hideEdgesOnDrag":true,"hover":true}}
-        """)
+        # Ab einigen tausend Knoten ist die vis.js-Physik im Browser der Flaschenhals.
+        options = VIS_OPTIONS
+        if len(nodes) > STATIC_LAYOUT_THRESHOLD:
+            main_logger.info("%s Knoten: Berechne statisches Layout, Physik wird deaktiviert.", len(nodes))
+            positions = compute_static_layout([n['id'] for n in nodes], flows.keys())
+            for node in nodes:
+                node['x'], node['y'] = positions[node['id']]
+            options = {**VIS_OPTIONS, 'physics': {'enabled': False}}
 
+        html = (VIS_HTML_TEMPLATE.replace("__NODES__", _script_json(nodes))
+                .replace("__EDGES__", _script_json(edges)).replace("__OPTIONS__", _script_json(options)))
         try:
-            net.save_graph(VISUALIZATION_FILE)
-            main_logger.info(f"Netzwerk-Visualisierung aktualisiert: {VISUALIZATION_FILE}")
+            with open(VISUALIZATION_FILE, 'w', encoding='utf-8') as f:
+                f.write(html)
+            _write_json_file(VIS_META_FILE, render_key)
+            main_logger.info("Netzwerk-Visualisierung aktualisiert: %s", VISUALIZATION_FILE)
         except Exception as e:
-            main_logger.error(f"Fehler beim Speichern der Visualisierung: {e}")
+            main_logger.error("Fehler beim Speichern der Visualisierung: %s", e)
+
+# --- RPC-Verbindungen ---
+def create_http_session() -> "httpx.Client":
+    """Ein gepoolter HTTP-Client für alle RPC-Aufrufe; Verbindungen (TCP+TLS) bleiben über Läufe hinweg offen."""
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=75)
+    http2 = HTTP2_AVAILABLE and CONFIG.get("rpc_http2", True)
+    # retries greift nur bei Verbindungsfehlern; 429/5xx behandeln die Aufrufer selbst.
+    return httpx.Client(timeout=30, limits=limits, http2=http2, transport=httpx.HTTPTransport(retries=3, limits=limits, http2=http2))
+
+# --- RPC-Drosselung ---
+class RateLimiter:
+    """Token-Bucket: erlaubt kurze Bursts bis `rps` Anfragen und drosselt nur bei Überschreitung.
+
+    Die Rate passt sich an den Endpunkt an: bei 429/erschöpftem Kontingent wird sie halbiert
+    (und ein Retry-After für alle Threads eingehalten), bei Erfolg steigt sie langsam wieder an.
+    """
+    def __init__(self, rps: float, min_rps: float = 1.0):
+        self.max_rate = float(rps)
+        self.min_rate = min(float(min_rps), self.max_rate)
+        self.rate = self.max_rate
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            sleep_for = max(-self.tokens / self.rate if self.tokens < 0 else 0, self.blocked_until - now)
+        # Außerhalb des Locks schlafen; der reservierte Slot ist bereits verbucht.
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+
+    def penalize(self, retry_after: float | None = None):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def reward(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+RETRY_BASE_DELAY, RETRY_MAX_DELAY = 1.0, 30.0
+
+def _retry_after_seconds(response) -> float | None:
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
 
 # --- Kernlogik ---
 class PeriodicChecker:
-    def __init__(self, debug_mode=False, freeze_sender=False, freeze_recipient=False, validate=False):
+    def __init__(self, debug_mode=False, freeze_sender=False, freeze_recipient=False, validate=False, http_session=None):
         self.debug_mode = debug_mode
         self.freeze_sender_on_violation = freeze_sender
         self.freeze_recipient_on_violation = freeze_recipient
         self.perform_validation = validate
         
+        self.http = http_session or create_http_session()
         self.client = Client(RPC_URL)
-        main_logger.info(f"Verbunden mit RPC-Endpunkt: {RPC_URL}")
+        # solana-py legt sonst einen eigenen httpx-Pool an; beide Wege teilen sich die Verbindungen.
+        self.client._provider.session = self.http
+        self.batch_size = CONFIG.get("rpc_batch_size", 100)
+        self.limiter = RateLimiter(CONFIG.get("rpc_rps", 10))
+        main_logger.info("Verbunden mit RPC-Endpunkt: %s", RPC_URL)
         self.payer_keypair = load_keypair("payer-wallet.json")
         self.mint_keypair = load_keypair("mint-wallet.json")
         self.mint_pubkey = self.mint_keypair.pubkey()
+        # Base58-Darstellungen einmalig berechnen statt bei jedem Vergleich/Log-Eintrag.
+        self.mint_str = str(self.mint_pubkey)
+        self.payer_pubkey = self.payer_keypair.pubkey()
+        self.payer_str = str(self.payer_pubkey)
         
-        self.whitelist: Set[str] = set()
+        # Die Whitelist ändert sich während eines Laufs nicht (frozenset, über Läufe gecacht).
+        self.whitelist: frozenset = frozenset()
         self.greylist: Set[str] = set()
+        self.max_workers = CONFIG.get("rpc_max_workers", 8)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # Base58-Dekodierung und ATA-Ableitung (PDA-Suche) sind pro Wallet konstant.
+        self._pubkey_cache: Dict[str, Pubkey] = {}
+        self._ata_cache: Dict[Pubkey, Pubkey] = {}
+        # Umkehrung ATA -> Owner (Base58) für Freeze/Thaw-Events; gefüllt durch _ata() und RPC-Lookups.
+        self._owner_by_ata: Dict[str, str] = {}
+        # Laufende Freeze-Aktionen (senden + auf "finalized" warten) blockieren die Analyse nicht. Eigener kleiner
+        # Pool: im self.executor würden sie Worker belegen, die Batch-Abrufe und der Fenster-Prefetch einplanen.
+        self._pending_freezes: Dict[Pubkey, Any] = {}
+        self._freeze_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="freeze")
+        # Transaktions-Events schreibt ein eigener Thread; die Analyse wartet nie auf die Festplatte.
+        self._log_queue: "queue.Queue[bytes | None]" = queue.Queue()
+        self._log_writer = threading.Thread(target=self._log_writer_loop, name="tx-log-writer", daemon=True)
+        self._log_writer.start()
+        self._gpa_supported = True
+        # Hedging: bleibt die Antwort länger als das p95 der letzten Latenzen aus, geht dieselbe Anfrage
+        # zusätzlich an den nächsten Endpunkt. rpc_hedge_delay gilt, bis genug Messwerte vorliegen.
+        self._hedge_delay_default = CONFIG.get("rpc_hedge_delay", 0.25)
+        self._latencies: deque = deque(maxlen=200)
+        self._provider_stats = {url: {'wins': 0, 'errors': 0} for url in RPC_URLS}
+        self._hedge_pool = ThreadPoolExecutor(max_workers=self.max_workers * len(RPC_URLS)) if len(RPC_URLS) > 1 else None
 
-    def get_token_balance(self, wallet_str: str) -> float | None:
-        try:
-            wallet_pubkey = Pubkey.from_string(wallet_str)
-            ata = get_associated_token_address(wallet_pubkey, self.mint_pubkey)
-            balance_resp = self.client.get_token_account_balance(ata)
-            return balance_resp.value.ui_amount if balance_resp.value else 0.0
-        except SolanaRpcException:
-            return 0.0
-        except Exception as e:
-            main_logger.error(f"Kritischer Fehler beim Abrufen des Saldos für {wallet_str}: {e}")
+    def _pk(self, address: str) -> Pubkey:
+        pk = self._pubkey_cache.get(address)
+        if pk is None:
+            pk = self._pubkey_cache[address] = Pubkey.from_string(address)
+        return pk
+
+    def _ata(self, owner: Pubkey) -> Pubkey:
+        ata = self._ata_cache.get(owner)
+        if ata is None:
+            ata = self._ata_cache[owner] = get_associated_token_address(owner, self.mint_pubkey)
+            self._owner_by_ata[str(ata)] = str(owner)
+        return ata
+
+    def _fetch_mint_token_accounts(self) -> Dict[str, int] | None:
+        """Alle Token-Konten des Mints (ATA-Adresse -> Bestand) mit einem getProgramAccounts-Aufruf; None, falls nicht unterstützt."""
+        params = [str(TOKEN_PROGRAM_ID), {"encoding": "jsonParsed", "filters": [{"dataSize": 165}, {"memcmp": {"offset": 0, "bytes": self.mint_str}}]}]
+        envelope = self._rpc_batch("getProgramAccounts", [params])[0]
+        if envelope is None:
+            # Timeout/HTTP-Fehler: nur dieser Aufruf fällt auf getMultipleAccounts zurück.
+            main_logger.warning("getProgramAccounts ohne Antwort. Nutze für diesen Lauf getMultipleAccounts.")
+            return None
+        if 'error' in envelope:
+            # Viele öffentliche Endpunkte sperren getProgramAccounts; dann bleibt es dauerhaft bei getMultipleAccounts.
+            main_logger.warning("getProgramAccounts nicht verfügbar (%s). Nutze getMultipleAccounts.", envelope['error'])
+            self._gpa_supported = False
             return None
+        return {item['pubkey']: int(item['account']['data']['parsed']['info']['tokenAmount']['amount']) for item in envelope['result']}
+
+    def batch_get_token_balances(self, wallets: List[str]) -> Dict[str, int | None]:
+        """Token-Bestände (Basiseinheiten) vieler Wallets über getMultipleAccounts, 100 ATAs pro Aufruf; None bei Fehler.
+
+        Ab `gpa_min_wallets` Wallets werden stattdessen alle Konten des Mints auf einmal per getProgramAccounts geladen.
+        """
+        if self._gpa_supported and len(wallets) >= CONFIG.get("gpa_min_wallets", 200):
+            accounts = self._fetch_mint_token_accounts()
+            if accounts is not None:
+                return {w: accounts.get(str(self._ata(self._pk(w))), 0) for w in wallets}
+        balances = {}
+        for start in range(0, len(wallets), 100):
+            chunk = wallets[start:start + 100]
+            try:
+                self.limiter.acquire()
+                accounts = self.client.get_multiple_accounts_json_parsed([self._ata(self._pk(w)) for w in chunk]).value
+            except Exception as e:
+                main_logger.error("Fehler beim Abrufen der Salden für Wallets %s-%s: %s", start+1, start+len(chunk), e)
+                balances.update(dict.fromkeys(chunk))
+                continue
+            for wallet, acc in zip(chunk, accounts):
+                # Nicht existierendes ATA bedeutet Saldo 0.
+                balances[wallet] = int(acc.data.parsed['info']['tokenAmount']['amount']) if acc is not None else 0
+        return balances
+
+    def batch_get_signatures(self, wallets: List[str], until: Dict[str, str | None] | None = None, limit: int = 1000) -> Dict[str, List | None]:
+        """Erste Signatur-Seite aller Wallets in einem JSON-RPC-Batch; None bei Fehler.
 
-    def get_new_signatures_paginated(self, wallet_address: str, last_known_signature_str: str | None) -> List:
-        all_new_sig_infos = []
+        Mit `until` (Wallet -> letzte bekannte Signatur) liefert die Node nur neuere Signaturen.
+        """
+        pages = {}
+        until = until or {}
+        params_list = []
+        for w in wallets:
+            config = {"limit": limit}
+            if until.get(w): config["until"] = until[w]
+            params_list.append([w, config])
+        envelopes = self._rpc_batch("getSignaturesForAddress", params_list)
+        for wallet, envelope in zip(wallets, envelopes):
+            pages[wallet] = None
+            if envelope is None or 'error' in envelope: continue
+            try:
+                pages[wallet] = GetSignaturesForAddressResp.from_json(json_dumps(envelope)).value
+            except Exception as e:
+                main_logger.error("Ungültige Signatur-Antwort für %s: %s", wallet, e)
+        return pages
+
+    def get_new_signatures_paginated(self, wallet_address: str, last_known_signature_str: str | None, first_page: List | None = None) -> deque:
+        # Seiten kommen neueste zuerst; extendleft dreht sie beim Einfügen um (älteste zuerst, ohne reversed()-Kopie).
+        all_new_sig_infos = deque()
         before_sig = None
         limit = 1000
         try:
-            pubkey = Pubkey.from_string(wallet_address)
+            pubkey = self._pk(wallet_address)
             last_known_sig = Signature.from_string(last_known_signature_str) if last_known_signature_str else None
 
             while True:
-                signatures_resp = self.client.get_signatures_for_address(pubkey, limit=limit, before=before_sig)
-                if not signatures_resp.value: break
-                batch = signatures_resp.value
-                found_last = any(last_known_sig and si.signature == last_known_sig for si in batch)
-                
-                for si in batch:
-                    if last_known_sig and si.signature == last_known_sig: break
-                    all_new_sig_infos.append(si)
-                
-                if found_last or len(batch) < limit: break
+                if first_page is not None:
+                    # Bereits per Batch geladene erste Seite verwenden.
+                    batch, first_page = first_page, None
+                else:
+                    self.limiter.acquire()
+                    batch = self.client.get_signatures_for_address(pubkey, limit=limit, before=before_sig, until=last_known_sig).value
+                if not batch: break
+                # Dank `until` endet die Liste vor der letzten bekannten Signatur: alles ist neu.
+                all_new_sig_infos.extendleft(batch)
+                if len(batch) < limit: break
                 before_sig = batch[-1].signature
             
-            return list(reversed(all_new_sig_infos))
+            return all_new_sig_infos
         except Exception as e:
-            main_logger.error(f"Fehler beim lückenlosen Abrufen der Signaturen für {wallet_address}: {e}")
-            return []
+            main_logger.error("Fehler beim lückenlosen Abrufen der Signaturen für %s: %s", wallet_address, e)
+            return deque()
+
+    def _probe_unchanged_wallets(self, wallets: List[str], state: dict) -> Set[str]:
+        """Ermittelt Wallets ohne neue Aktivität mit einem gemischten Batch statt N Einzelabfragen.
+
+        Jedes Wallet mit bekannter letzter Signatur wird per getSignaturesForAddress(limit=1) geprüft;
+        Greylist-Wallets zusätzlich über ihren Kontostand im selben HTTP-Request.
+        """
+        # Index Wallet -> (letzter Saldo, letzte Signatur) einmalig aus dem Status.
+        known = {}
+        for w in wallets:
+            last_sig = _state_last_sig(state.get(w))
+            if not last_sig: continue
+            entry = state[w]
+            check_balance = w in self.greylist and isinstance(entry, dict) and "last_balance" in entry
+            known[w] = (entry["last_balance"] if check_balance else None, last_sig, check_balance)
+        if not known: return set()
+
+        candidates = list(known)
+        calls, slots = [], []
+        for w in candidates:
+            balance_slot = None
+            if known[w][2]:
+                balance_slot = len(calls)
+                calls.append(("getTokenAccountBalance", [str(self._ata(self._pk(w)))]))
+            slots.append((balance_slot, len(calls)))
+            calls.append(("getSignaturesForAddress", [w, {"limit": 1}]))
+        envelopes = self._rpc_calls(calls)
+
+        unchanged = set()
+        for wallet, (balance_slot, sig_slot) in zip(candidates, slots):
+            last_bal, last_sig, check_balance = known[wallet]
+            if check_balance:
+                balance_env = envelopes[balance_slot]
+                if balance_env is None: continue
+                if 'error' in balance_env:
+                    # Ein nicht existierendes ATA entspricht Saldo 0.
+                    if "could not find account" not in str(balance_env['error'].get('message', '')): continue
+                    current_bal = 0
+                else:
+                    current_bal = int(balance_env['result']['value']['amount'])
+                if current_bal != last_bal: continue
+
+            sig_env = envelopes[sig_slot]
+            if sig_env is None or 'error' in sig_env:
+                main_logger.error("-> Fehler bei Sicherheits-Check für %s: %s. Erzwinge Tiefenanalyse.", wallet, sig_env.get('error') if sig_env else 'keine Antwort')
+                continue
+            result = sig_env.get('result') or []
+            latest_sig_on_chain = result[0]['signature'] if result else None
+            if latest_sig_on_chain == last_sig:
+                main_logger.log(logging.INFO if check_balance else logging.DEBUG, "-> Signatur unverändert. Überspringe Tiefenanalyse für %s.", truncate_address(wallet))
+                unchanged.add(wallet)
+            elif check_balance:
+                main_logger.warning("-> Kontostand gleich, aber neue Signatur gefunden! Erzwinge Tiefenanalyse für %s.", truncate_address(wallet))
+        return unchanged
+
+    def _scan_wallet(self, wallet: str, state_entry, first_page: List | None = None) -> deque:
+        """Ermittelt neue Signaturen eines Wallets seit der zuletzt gespeicherten."""
+        main_logger.debug("Führe Tiefenanalyse für Wallet aus: %s", wallet)
+        return self.get_new_signatures_paginated(wallet, _state_last_sig(state_entry), first_page)
 
-    def get_transaction_with_retries(self, signature: Signature, max_retries=3):
+    def _post_checked(self, url: str, payload) -> "httpx.Response":
+        started = time.monotonic()
+        resp = self.http.post(url, json=payload)
+        resp.raise_for_status()
+        self._latencies.append(time.monotonic() - started)
+        return resp
+
+    @property
+    def hedge_delay(self) -> float:
+        """p95 der letzten erfolgreichen Anfragen; vor 20 Messwerten der konfigurierte rpc_hedge_delay."""
+        samples = sorted(self._latencies)
+        if len(samples) < 20: return self._hedge_delay_default
+        return samples[int(len(samples) * 0.95)]
+
+    def _post_rpc(self, payload) -> "httpx.Response":
+        """POST an den historisch schnellsten Endpunkt; bleibt die Antwort aus, wird gestaffelt an weitere gehedgt."""
+        if self._hedge_pool is None:
+            return self._post_checked(RPC_URL, payload)
+        remaining = sorted(RPC_URLS, key=lambda u: self._provider_stats[u]['errors'] - self._provider_stats[u]['wins'])
+        in_flight, last_error = {}, None
+        while remaining or in_flight:
+            if remaining:
+                url = remaining.pop(0)
+                # Die erste Anfrage hat der Aufrufer schon beim Limiter angemeldet, jede weitere zählt extra.
+                if len(remaining) < len(RPC_URLS) - 1: self.limiter.acquire()
+                in_flight[self._hedge_pool.submit(self._post_checked, url, payload)] = url
+            done, _ = wait(in_flight, timeout=self.hedge_delay if remaining else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = in_flight.pop(future)
+                try:
+                    resp = future.result()
+                except Exception as e:
+                    self._provider_stats[url]['errors'] += 1
+                    last_error = e
+                    continue
+                # Langsamere Anfragen laufen im Hintergrund aus, ihr Ergebnis wird verworfen.
+                self._provider_stats[url]['wins'] += 1
+                return resp
+        raise last_error
+
+    def _rpc_batch(self, method: str, params_list: list, max_retries=3) -> list:
+        """Sendet gleichartige Aufrufe als JSON-RPC-Batch(es). Antworten in Aufrufreihenfolge, None bei Fehler."""
+        return self._rpc_calls([(method, params) for params in params_list], max_retries)
+
+    def _rpc_calls(self, calls: List[tuple], max_retries=3) -> list:
+        """Wie _rpc_batch, aber mit beliebigen (Methode, Parameter)-Paaren in einem Batch."""
+        method = "/".join(sorted({m for m, _ in calls}))
+        if len(calls) > self.batch_size:
+            # Teil-Batches laufen parallel im Thread-Pool (Limiter/Backoff gelten je Request);
+            # daher nie aus einer Aufgabe dieses Pools heraus aufrufen.
+            chunks = [calls[start:start + self.batch_size] for start in range(0, len(calls), self.batch_size)]
+            return [item for part in self.executor.map(lambda chunk: self._rpc_calls(chunk, max_retries), chunks) for item in part]
+        payload = [{"jsonrpc": "2.0", "id": i, "method": m, "params": params} for i, (m, params) in enumerate(calls)]
+        backoff = RETRY_BASE_DELAY
         for attempt in range(max_retries):
             try:
-                time.sleep(0.35)
-                return self.client.get_transaction(signature, max_supported_transaction_version=0, encoding="jsonParsed")
-            except SolanaRpcException as e:
-                if isinstance(e.__cause__, HTTPStatusError) and e.__cause__.response.status_code == 429:
-                    wait = 2 ** (attempt + 1)
-                    main_logger.warning(f"Ratenbegrenzung bei TX {signature}. Warte {wait}s...")
-                    time.sleep(wait)
+                self.limiter.acquire()
+                resp = self._post_rpc(payload)
+                # Anbieter wie Helius/QuickNode melden das Restkontingent im Header.
+                if resp.headers.get('X-RateLimit-Remaining') == '0':
+                    self.limiter.penalize(_retry_after_seconds(resp))
                 else:
-                    main_logger.error(f"RPC-Fehler für TX {signature}: {e}")
-                    return None
-        main_logger.error(f"Konnte TX {signature} nach {max_retries} Versuchen nicht laden.")
-        return None
+                    self.limiter.reward()
+                body = json_loads(resp.content)
+                if not isinstance(body, list):
+                    main_logger.error("RPC-Batch %s abgelehnt: %s", method, body)
+                    return [None] * len(calls)
+                # Laut JSON-RPC-Spezifikation darf die Reihenfolge der Antworten abweichen.
+                by_id = {item.get('id'): item for item in body}
+                return [by_id.get(i) for i in range(len(calls))]
+            except HTTPStatusError as e:
+                if e.response.status_code == 429:
+                    # Retry-After gilt über den Limiter für alle Threads; ohne Header "decorrelated jitter",
+                    # damit parallele Worker nicht im Gleichtakt erneut anfragen.
+                    backoff = min(RETRY_MAX_DELAY, random.uniform(RETRY_BASE_DELAY, backoff * 3))
+                    delay = _retry_after_seconds(e.response) or round(backoff, 2)
+                    self.limiter.penalize(delay)
+                    main_logger.warning("Ratenbegrenzung bei RPC-Batch %s (%s Aufrufe). Warte %ss, Rate jetzt %.1f/s...", method, len(calls), delay, self.limiter.rate)
+                else:
+                    main_logger.error("RPC-Fehler bei Batch %s: %s", method, e)
+                    return [None] * len(calls)
+            except (httpx.HTTPError, json.JSONDecodeError) as e:
+                main_logger.error("RPC-Fehler bei Batch %s: %s", method, e)
+                return [None] * len(calls)
+        main_logger.error("Konnte RPC-Batch %s nach %s Versuchen nicht laden.", method, max_retries)
+        return [None] * len(calls)
+
+    def get_transactions_with_retries(self, signatures: List[Signature]) -> Dict[Signature, Any]:
+        """Lädt Transaktionen gebündelt (rpc_batch_size pro HTTP-Request, mehrere Requests parallel).
 
-    def analyze_transaction(self, signature: Signature, block_time: int | None, monitored_wallets: set, state: dict):
-        tx_resp = self.get_transaction_with_retries(signature)
-        if not (tx_resp and tx_resp.value and tx_resp.value.transaction and tx_resp.value.transaction.meta):
-            main_logger.error(f"Analyse für TX {signature} übersprungen: Details nicht geladen.")
+        Liefert die rohen JSON-RPC-Antworten (jsonParsed); die Analyse arbeitet direkt auf den Dicts.
+        """
+        tx_config = {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}
+        results = {}
+        envelopes = self._rpc_batch("getTransaction", [[str(sig), tx_config] for sig in signatures])
+        for sig, envelope in zip(signatures, envelopes):
+            if envelope is None or 'error' in envelope:
+                main_logger.error("RPC-Fehler für TX %s: %s", sig, envelope.get('error') if envelope else 'keine Antwort')
+                continue
+            results[sig] = envelope
+        return results
+
+    def _mint_deltas(self, meta: dict) -> Dict[str, int] | None:
+        """Saldoänderung pro Owner (Basiseinheiten) direkt aus der Roh-Antwort, in einem Durchlauf.
+
+        None, falls kein TokenBalance unseren Mint betrifft; die Node listet jedes beteiligte
+        Token-Konto (auch bei Freeze/Thaw), die Transaktion ist dann irrelevant.
+        """
+        mint = self.mint_str
+        matched = False
+        deltas = {}
+        get = deltas.get
+        for sign, balances in ((-1, meta.get('preTokenBalances')), (1, meta.get('postTokenBalances'))):
+            for tb in (balances or ()):
+                if tb.get('mint') != mint: continue
+                matched = True
+                owner = tb.get('owner')
+                amount_str = (tb.get('uiTokenAmount') or {}).get('amount')
+                if owner and amount_str:
+                    deltas[owner] = get(owner, 0) + sign * int(amount_str)
+        return deltas if matched else None
+
+    def analyze_transaction(self, signature: Signature, block_time: int | None, monitored_wallets: set, state: dict, envelope: dict | None):
+        result = envelope.get('result') if envelope else None
+        if not (result and result.get('transaction') and result.get('meta')):
+            main_logger.error("Analyse für TX %s übersprungen: Details nicht geladen.", signature)
             return
-        if tx_resp.value.transaction.meta.err: return
+        if result['meta'].get('err'): return
 
         try:
-            tx = tx_resp.value.transaction
-            tx_meta = tx.meta
-            final_block_time = tx_resp.value.block_time or block_time
-            self._analyze_transfers(signature, tx_meta, final_block_time, monitored_wallets, state)
-            self._analyze_freeze_thaw(signature, tx, final_block_time)
+            # Mint-Prüfung und Saldo-Differenzen in einem Durchlauf über das Roh-Dict.
+            deltas = self._mint_deltas(result['meta'])
+            if deltas is None: return
+            final_block_time = result.get('blockTime') or block_time
+            # Die erste Signatur der Antwort ist die Transaktions-ID; erspart das erneute Base58-Kodieren.
+            sig_str = (result['transaction'].get('signatures') or [None])[0] or str(signature)
+            self._analyze_transfers(sig_str, deltas, final_block_time, monitored_wallets, state)
+            self._analyze_freeze_thaw(sig_str, result, final_block_time)
         except Exception:
-            main_logger.error(f"Unerwarteter Fehler bei der Analyse von TX {signature}:\n{traceback.format_exc()}")
+            main_logger.exception("Unerwarteter Fehler bei der Analyse von TX %s:", signature)
 
     def _freeze_account(self, wallet_to_freeze_pubkey: Pubkey):
-        main_logger.warning(f"Leite Freeze-Aktion für Wallet {wallet_to_freeze_pubkey} ein...")
+        main_logger.warning("Leite Freeze-Aktion für Wallet %s ein...", wallet_to_freeze_pubkey)
         try:
-            ata = get_associated_token_address(wallet_to_freeze_pubkey, self.mint_pubkey)
-            ix = freeze_account(FreezeAccountParams(program_id=TOKEN_PROGRAM_ID, account=ata, mint=self.mint_pubkey, authority=self.payer_keypair.pubkey()))
+            ata = self._ata(wallet_to_freeze_pubkey)
+            ix = freeze_account(FreezeAccountParams(program_id=TOKEN_PROGRAM_ID, account=ata, mint=self.mint_pubkey, authority=self.payer_pubkey))
             latest_hash = self.client.get_latest_blockhash().value.blockhash
-            tx = Transaction.new_signed_with_payer([ix], self.payer_keypair.pubkey(), [self.payer_keypair], latest_hash)
+            tx = Transaction.new_signed_with_payer([ix], self.payer_pubkey, [self.payer_keypair], latest_hash)
             sig = self.client.send_transaction(tx, opts=TxOpts(skip_confirmation=False)).value
             self.client.confirm_transaction(sig, "finalized")
-            main_logger.info(f"✅ Freeze für Wallet {wallet_to_freeze_pubkey} bestätigt. Signatur: {sig}")
+            main_logger.info("✅ Freeze für Wallet %s bestätigt. Signatur: %s", wallet_to_freeze_pubkey, sig)
             self._log_event(str(sig), "ACCOUNT_FROZEN_BY_SCRIPT", None, frozen_wallet=str(wallet_to_freeze_pubkey))
         except Exception as e:
-            main_logger.error(f"FEHLER beim Einfrieren von {wallet_to_freeze_pubkey}: {e}")
+            main_logger.error("FEHLER beim Einfrieren von %s: %s", wallet_to_freeze_pubkey, e)
+
+    def _submit_freeze(self, wallet: Pubkey):
+        # Pro Wallet und Pass nur eine Freeze-Transaktion, auch bei mehreren Verstößen.
+        if wallet not in self._pending_freezes:
+            self._pending_freezes[wallet] = self._freeze_pool.submit(self._freeze_account, wallet)
 
-    def _process_transfer(self, signature: str, block_time: int | None, monitored: set, state: dict, sender: str, recipient: str, amount: float):
+    def _wait_for_freezes(self):
+        if not self._pending_freezes: return
+        main_logger.info("Warte auf %s Freeze-Aktion(en)...", len(self._pending_freezes))
+        wait(self._pending_freezes.values())
+        self._pending_freezes.clear()
+
+    def _process_transfer(self, signature: str, block_time: int | None, monitored: set, state: dict, sender: str, recipient: str, amount_raw: int):
+        amount_str = format_token_amount(amount_raw)
         if recipient not in monitored:
             status = 'VIOLATION'
-            main_logger.warning(f"-> VERSTOSS in TX {signature}: {amount:.4f} von {truncate_address(sender)} an {truncate_address(recipient)}")
-            main_logger.warning(f"-> Empfänger {recipient} wird zur Greylist hinzugefügt.")
+            main_logger.warning("-> VERSTOSS in TX %s: %s von %s an %s", signature, amount_str, truncate_address(sender), truncate_address(recipient))
+            main_logger.warning("-> Empfänger %s wird zur Greylist hinzugefügt.", recipient)
             self.greylist.add(recipient)
             
             if recipient not in state or not isinstance(state.get(recipient), dict):
                 state[recipient] = {}
             state[recipient]['last_sig'] = signature
-            main_logger.info(f"-> Setze Startpunkt für neue Greylist-Wallet {truncate_address(recipient)} auf TX {signature}")
+            main_logger.info("-> Setze Startpunkt für neue Greylist-Wallet %s auf TX %s", truncate_address(recipient), signature)
             
             if self.freeze_sender_on_violation and "Multiple" not in sender:
-                self._freeze_account(Pubkey.from_string(sender))
+                self._submit_freeze(self._pk(sender))
             if self.freeze_recipient_on_violation:
-                self._freeze_account(Pubkey.from_string(recipient))
+                self._submit_freeze(self._pk(recipient))
         else:
             status = 'AUTHORIZED_TRANSFER'
-            main_logger.debug(f"-> Transfer ({status}) in TX {signature}: {amount:.4f} von {sender} an {recipient}")
+            main_logger.debug("-> Transfer (%s) in TX %s: %s von %s an %s", status, signature, amount_str, sender, recipient)
         
-        self._log_event(signature, status, block_time, sender=sender, recipient=recipient, amount=amount)
+        self._log_event(signature, status, block_time, sender=sender, recipient=recipient,
+                        amount=amount_raw / TOKEN_BASE_UNITS, amount_raw=amount_raw)
 
-    def _analyze_transfers(self, signature: Signature, tx_meta, block_time: int | None, monitored: set, state: dict):
-        if not any(hasattr(b, 'mint') and str(b.mint) == str(self.mint_pubkey) for b in (tx_meta.pre_token_balances or []) + (tx_meta.post_token_balances or [])):
+    def _analyze_transfers(self, sig_str: str, owner_balances: Dict[str, int], block_time: int | None, monitored: set, state: dict):
+        if not owner_balances:
             return
-
-        owner_balances = defaultdict(int)
-        for tb in (tx_meta.pre_token_balances or []):
-            if hasattr(tb, 'owner') and str(getattr(tb, 'mint', '')) == str(self.mint_pubkey):
-                owner_balances[str(tb.owner)] -= int(getattr(tb.ui_token_amount, 'amount', 0))
-        for tb in (tx_meta.post_token_balances or []):
-            if hasattr(tb, 'owner') and str(getattr(tb, 'mint', '')) == str(self.mint_pubkey):
-                owner_balances[str(tb.owner)] += int(getattr(tb.ui_token_amount, 'amount', 0))
         
-        senders = {owner: -change for owner, change in owner_balances.items() if change < 0}
-        recipients = {owner: change for owner, change in owner_balances.items() if change > 0}
+        senders, recipients = {}, {}
+        for owner, change in owner_balances.items():
+            if change < 0: senders[owner] = -change
+            elif change > 0: recipients[owner] = change
         
         if not senders or not recipients: return
 
-        sig_str = str(signature)
         if len(senders) == 1 and len(recipients) == 1:
-            sender, s_amt = list(senders.items())[0]
-            recipient, r_amt = list(recipients.items())[0]
+            (sender, s_amt), = senders.items()
+            (recipient, r_amt), = recipients.items()
             if abs(s_amt - r_amt) < 1:
-                self._process_transfer(sig_str, block_time, monitored, state, sender, recipient, float(r_amt) / (10**TOKEN_DECIMALS))
+                self._process_transfer(sig_str, block_time, monitored, state, sender, recipient, r_amt)
         else:
-            main_logger.debug(f"-> Komplexe TX {sig_str}: {len(senders)} Sender, {len(recipients)} Empfänger.")
-            all_sender_keys = ", ".join([truncate_address(s) for s in senders.keys()])
-            sender_str = list(senders.keys())[0] if len(senders) == 1 else f"Multiple ({all_sender_keys})"
+            main_logger.debug("-> Komplexe TX %s: %s Sender, %s Empfänger.", sig_str, len(senders), len(recipients))
+            if len(senders) == 1:
+                sender_str = next(iter(senders))
+            else:
+                sender_str = f"Multiple ({', '.join(truncate_address(s) for s in senders)})"
             for recipient, amount_raw in recipients.items():
-                self._process_transfer(sig_str, block_time, monitored, state, sender_str, recipient, float(amount_raw) / (10**TOKEN_DECIMALS))
+                self._process_transfer(sig_str, block_time, monitored, state, sender_str, recipient, amount_raw)
+
+    def _tx_ata_owners(self, result: dict) -> Dict[str, str]:
+        """ATA -> Owner aus den TokenBalances einer Transaktion (Roh-Antwort)."""
+        account_keys = result['transaction']['message'].get('accountKeys') or []
+        meta = result['meta']
+        ata_to_owner = {}
+        for tb in chain(meta.get('preTokenBalances') or (), meta.get('postTokenBalances') or ()):
+            index = tb.get('accountIndex', len(account_keys))
+            if tb.get('mint') == self.mint_str and tb.get('owner') and index < len(account_keys):
+                key = account_keys[index]
+                ata_to_owner.setdefault(key['pubkey'] if isinstance(key, dict) else key, tb['owner'])
+        return ata_to_owner
 
-    def _analyze_freeze_thaw(self, signature: Signature, tx, block_time: int | None):
-        for instruction in tx.transaction.message.instructions:
-            parsed = getattr(instruction, 'parsed', None)
-            instr_type = parsed.get('type') if isinstance(parsed, dict) else getattr(parsed, 'type', None)
+    def _analyze_freeze_thaw(self, sig_str: str, result: dict, block_time: int | None):
+        # jsonParsed liefert Mint, Konten und Instruktionstyp bereits als Strings: reine String-Vergleiche.
+        # Die ATA -> Owner-Zuordnung wird erst beim ersten Freeze/Thaw unseres Mints aufgebaut.
+        ata_to_owner = None
+        for instruction in result['transaction']['message'].get('instructions') or ():
+            parsed = instruction.get('parsed')
+            if not isinstance(parsed, dict): continue
+            instr_type = parsed.get('type')
             if instr_type not in ['freezeAccount', 'thawAccount']: continue
 
-            info = parsed.get('info') if isinstance(parsed, dict) else getattr(parsed, 'info', None)
-            if not info or str(info.get('mint') if isinstance(info, dict) else getattr(info, 'mint', '')) != str(self.mint_pubkey): continue
+            info = parsed.get('info')
+            if not info or info.get('mint') != self.mint_str: continue
 
-            ata_address = info.get('account') if isinstance(info, dict) else str(getattr(info, 'account', ''))
-            owner_address = None
-            try:
-                info_resp = self.client.get_account_info_json_parsed(Pubkey.from_string(ata_address))
-                if info_resp.value and info_resp.value.data:
-                    owner_address = info_resp.value.data.parsed['info']['owner']
-            except Exception as e: main_logger.error(f"-> RPC-Lookup für Owner von {ata_address} fehlgeschlagen: {e}")
+            ata_address = info.get('account')
+            if ata_to_owner is None: ata_to_owner = self._tx_ata_owners(result)
+            owner_address = ata_to_owner.get(ata_address) or self._owner_by_ata.get(ata_address)
+            if not owner_address:
+                try:
+                    self.limiter.acquire()
+                    info_resp = self.client.get_account_info_json_parsed(self._pk(ata_address))
+                    if info_resp.value and info_resp.value.data:
+                        owner_address = info_resp.value.data.parsed['info']['owner']
+                        self._owner_by_ata[ata_address] = owner_address
+                except Exception as e: main_logger.error("-> RPC-Lookup für Owner von %s fehlgeschlagen: %s", ata_address, e)
 
             if not owner_address:
-                main_logger.warning(f"-> Konnte Owner für {ata_address} in TX {signature} nicht ermitteln.")
+                main_logger.warning("-> Konnte Owner für %s in TX %s nicht ermitteln.", ata_address, sig_str)
                 continue
 
             status = 'ACCOUNT_FROZEN' if instr_type == 'freezeAccount' else 'ACCOUNT_THAWED'
-            main_logger.info(f"-> Aktion '{status}' in TX {signature} für Wallet {owner_address} entdeckt.")
+            main_logger.info("-> Aktion '%s' in TX %s für Wallet %s entdeckt.", status, sig_str, owner_address)
             log_params = {'frozen_wallet': owner_address} if status == 'ACCOUNT_FROZEN' else {'thawed_wallet': owner_address}
-            self._log_event(str(signature), status, block_time, **log_params)
+            self._log_event(sig_str, status, block_time, **log_params)
 
-    def _perform_supply_validation(self, monitored_wallets: set):
+    def _perform_supply_validation(self, balances: Dict[str, int | None], aggregates: dict | None = None):
+        """Vergleicht die verteilte Menge mit den Salden, die run_check gerade on-chain geladen hat (kein zweiter Abruf)."""
         main_logger.info("--- Starte optionalen Validierungs-Check der Token-Menge ---")
         
-        total_distributed = 0
-        payer_address = str(self.payer_keypair.pubkey())
-        if os.path.exists(TRANSACTION_LOG_FILE):
-            with open(TRANSACTION_LOG_FILE, 'r') as f:
-                for line in f:
-                    try:
-                        log = json.loads(line)
-                        if log.get('status') in ['VIOLATION', 'AUTHORIZED_TRANSFER'] and log.get('sender') == payer_address:
-                            total_distributed += log.get('amount', 0)
-                    except json.JSONDecodeError:
-                        continue
-        main_logger.info(f"[VALIDATION] Laut Log-Datei wurden {total_distributed:.4f} Tokens vom Payer verteilt.")
+        payer_address = self.payer_str
+        if aggregates is None: aggregates = load_log_aggregates(TRANSACTION_LOG_FILE)
+        total_distributed = aggregates['sent'].get(payer_address, 0)
+        main_logger.info("[VALIDATION] Laut Log-Datei wurden %s Tokens vom Payer verteilt.", format_token_amount(total_distributed))
 
         total_on_chain_balance = 0
         payer_on_chain_balance = 0
         wallets_with_balance = 0
-        main_logger.info(f"[VALIDATION] Frage On-Chain-Bestände für {len(monitored_wallets)} überwachte Wallets ab...")
+        main_logger.info("[VALIDATION] Werte On-Chain-Bestände für %s überwachte Wallets aus...", len(balances))
 
-        for i, wallet_str in enumerate(sorted(list(monitored_wallets))):
-            try:
-                if self.debug_mode or (i % 10 == 0):
-                    main_logger.info(f"[VALIDATION] Frage Bestand ab für Wallet {i+1}/{len(monitored_wallets)}...")
-                
-                current_balance = self.get_token_balance(wallet_str)
-                if current_balance is not None:
-                    total_on_chain_balance += current_balance
-                    if current_balance > 0:
-                        wallets_with_balance += 1
-                
-                if wallet_str == payer_address:
-                    payer_on_chain_balance = current_balance if current_balance is not None else 0
-                time.sleep(0.1)
-            except Exception as e:
-                main_logger.error(f"[VALIDATION] Fehler beim Abrufen des Saldos für {wallet_str}: {e}")
+        # Kein Cache über Läufe hinweg: Eingänge in ein bestehendes ATA erzeugen keine Signatur des Owners,
+        # ein Saldo ist also nur frisch abgefragt verlässlich.
+        for wallet_str, current_balance in balances.items():
+            if current_balance is None: continue
+            total_on_chain_balance += current_balance
+            if current_balance > 0:
+                wallets_with_balance += 1
+            if wallet_str == payer_address:
+                payer_on_chain_balance = current_balance
 
-        main_logger.info(f"[VALIDATION] {wallets_with_balance} von {len(monitored_wallets)} Wallets halten Tokens.")
-        main_logger.info(f"[VALIDATION] Summe der On-Chain-Bestände: {total_on_chain_balance:.4f} Tokens.")
-        main_logger.info(f"[VALIDATION] Davon liegen {payer_on_chain_balance:.4f} Tokens noch im Payer-Wallet.")
+        main_logger.info("[VALIDATION] %s von %s Wallets halten Tokens.", wallets_with_balance, len(balances))
+        main_logger.info("[VALIDATION] Summe der On-Chain-Bestände: %s Tokens.", format_token_amount(total_on_chain_balance))
+        main_logger.info("[VALIDATION] Davon liegen %s Tokens noch im Payer-Wallet.", format_token_amount(payer_on_chain_balance))
         
         circulating_supply = total_on_chain_balance - payer_on_chain_balance
-        main_logger.info(f"[VALIDATION] Effektiver Token-Umlauf (ohne Payer): {circulating_supply:.4f} Tokens.")
+        main_logger.info("[VALIDATION] Effektiver Token-Umlauf (ohne Payer): %s Tokens.", format_token_amount(circulating_supply))
 
         discrepancy = abs(total_distributed - circulating_supply)
-        if discrepancy < 1e-4:
-            main_logger.info(f"✅ [VALIDATION] ERFOLGREICH: Die verteilte Menge stimmt mit dem effektiven Umlauf überein.")
+        if discrepancy == 0:
+            main_logger.info("✅ [VALIDATION] ERFOLGREICH: Die verteilte Menge stimmt mit dem effektiven Umlauf überein.")
         else:
-            main_logger.error(f"❌ [VALIDATION] FEHLGESCHLAGEN: Diskrepanz von {discrepancy:.4f} Tokens entdeckt!")
+            main_logger.error("❌ [VALIDATION] FEHLGESCHLAGEN: Diskrepanz von %s Tokens entdeckt!", format_token_amount(discrepancy))
         main_logger.info("--- Validierungs-Check abgeschlossen ---")
 
     def _log_event(self, signature: str, status: str, block_time: int | None, **kwargs):
         ts = datetime.utcfromtimestamp(block_time).isoformat() + "Z" if block_time else datetime.utcnow().isoformat() + "Z"
         log_entry = {'timestamp': ts, 'signature': signature, 'status': status, **kwargs}
-        transaction_logger.info(json.dumps(log_entry))
+        # Serialisierung bleibt beim Aufrufer, der Writer-Thread hängt nur noch Zeilen an.
+        self._log_queue.put(json_dumpb(log_entry) + b"\n")
+
+    def _log_writer_loop(self):
+        """Leert die Event-Queue und hängt alle verfügbaren Zeilen mit einem write() an; None beendet den Thread."""
+        os.makedirs(os.path.dirname(TRANSACTION_LOG_FILE), exist_ok=True)
+        while True:
+            lines = [self._log_queue.get()]
+            try:
+                while True: lines.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                pass
+            stop = None in lines
+            try:
+                with open(TRANSACTION_LOG_FILE, 'ab') as f:
+                    f.write(b"".join(line for line in lines if line is not None))
+            except OSError as e:
+                main_logger.error("Konnte Transaktions-Log nicht schreiben: %s", e)
+            finally:
+                for _ in lines: self._log_queue.task_done()
+            if stop: return
+
+    def _flush_log_events(self):
+        """Wartet, bis der Writer alle bisher erzeugten Events geschrieben hat (vor dem Lesen der Log-Datei)."""
+        self._log_queue.join()
+
+    def close(self):
+        self._log_queue.put(None)
+        self._log_writer.join(timeout=5)
+
+    @staticmethod
+    def _advance_last_sigs(state: dict, new_sigs_by_wallet: dict, unfetched: set):
+        """Setzt last_sig je Wallet auf die neueste Signatur vor der ältesten nicht geladenen (Listen älteste zuerst)."""
+        for wallet, new_sigs in new_sigs_by_wallet.items():
+            checkpoint = None
+            for sig_info in new_sigs:
+                if bytes(sig_info.signature) in unfetched: break
+                checkpoint = sig_info.signature
+            failed = sum(1 for sig_info in new_sigs if bytes(sig_info.signature) in unfetched)
+            if failed:
+                main_logger.warning("-> %s Signatur(en) von %s konnten nicht geladen werden; sie werden im nächsten Lauf erneut abgerufen.", failed, truncate_address(wallet))
+            if checkpoint is None: continue
+            if not isinstance(state.get(wallet), dict): state[wallet] = {'last_sig': state.get(wallet)}
+            state[wallet]['last_sig'] = str(checkpoint)
 
     def run_check(self):
-        main_logger.info(f"{'='*50}\nStarte Prüfungslauf um {datetime.now():%Y-%m-%d %H:%M:%S}")
+        main_logger.info("%s\nStarte Prüfungslauf um %s", '='*50, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         self.whitelist, self.greylist, state = load_whitelist(), load_greylist(), load_state()
         if not self.whitelist:
             main_logger.warning("Whitelist leer. Prüfung übersprungen.")
             return
 
-        wallets_scanned_in_run, signatures_found_in_run, signatures_processed_in_run = set(), {}, set()
+        # Signaturen werden durchgehend als 64-Byte-Schlüssel geführt; unfetched_in_run hält
+        # Fehlschläge dieses Laufs fest. Der Startpunkt (last_sig) eines Wallets rückt höchstens bis
+        # vor die älteste nicht geladene Signatur vor, damit der nächste Lauf sie erneut abruft.
+        wallets_scanned_in_run, unfetched_in_run = set(), set()
+        new_sigs_by_wallet = {}
+        # Über Läufe hinweg bereits analysierte Transaktionen werden weder erneut geladen noch doppelt geloggt.
+        processed_sigs = load_processed_signatures()
+        pending = deque()
         pass_num = 1
+        monitored_now = self.whitelist | self.greylist
+        # ATAs der überwachten Wallets vorab ableiten (gecacht), damit Freeze/Thaw-Events ohne RPC aufgelöst werden.
+        for wallet in monitored_now: self._ata(self._pk(wallet))
         while True:
-            main_logger.info(f"--- Starte Analyse-Pass #{pass_num} ---")
-            monitored_now = self.whitelist.union(self.greylist)
+            main_logger.info("--- Starte Analyse-Pass #%s ---", pass_num)
             wallets_to_scan = monitored_now - wallets_scanned_in_run
             if not wallets_to_scan:
                 main_logger.info("Keine neuen Wallets zum Scannen. Kette vollständig analysiert.")
                 break
 
-            main_logger.info(f"Scanne {len(wallets_to_scan)} Wallet(s) in diesem Pass.")
-            for wallet in sorted(list(wallets_to_scan)):
-                state_entry = state.get(wallet, {})
-                last_sig = state_entry.get('last_sig') if isinstance(state_entry, dict) else state_entry
-                
-                if wallet in self.greylist and isinstance(state_entry, dict) and "last_balance" in state_entry:
-                    last_bal = state_entry.get("last_balance")
-                    current_bal = self.get_token_balance(wallet)
-                    if current_bal is not None and abs(current_bal - last_bal) < 1e-9:
-                        main_logger.debug(f"-> Kontostand für {truncate_address(wallet)} gleich. Führe Sicherheits-Check der Signatur durch...")
-                        try:
-                            sig_resp = self.client.get_signatures_for_address(Pubkey.from_string(wallet), limit=1)
-                            latest_sig_on_chain = str(sig_resp.value[0].signature) if sig_resp.value else None
-                            if latest_sig_on_chain == last_sig or (latest_sig_on_chain is None and last_sig is None):
-                                main_logger.info(f"-> Signatur unverändert. Überspringe Tiefenanalyse für {truncate_address(wallet)}.")
-                                wallets_scanned_in_run.add(wallet)
-                                continue
-                            else:
-                                main_logger.warning(f"-> Kontostand gleich, aber neue Signatur gefunden! Erzwinge Tiefenanalyse für {truncate_address(wallet)}.")
-                        except Exception as e:
-                            main_logger.error(f"-> Fehler bei Sicherheits-Check für {wallet}: {e}. Erzwinge Tiefenanalyse.")
-                
-                main_logger.debug(f"Führe Tiefenanalyse für Wallet aus: {wallet}")
-                new_sigs = self.get_new_signatures_paginated(wallet, last_sig)
+            main_logger.info("Scanne %s Wallet(s) in diesem Pass.", len(wallets_to_scan))
+            # Die Signatur-Abfragen sind rein I/O-gebunden und laufen parallel; der
+            # gemeinsame Status wird anschließend seriell zusammengeführt.
+            scan_order = sorted(wallets_to_scan)
+            wallets_scanned_in_run.update(scan_order)
+            # Wallets ohne neue Signatur werden vorab gebündelt aussortiert (spart die 1000er-Seite).
+            unchanged = self._probe_unchanged_wallets(scan_order, state)
+            scan_order = [w for w in scan_order if w not in unchanged]
+            # Erste Seite aller Wallets gebündelt; nur Wallets mit mehr als einer Seite paginieren weiter.
+            first_pages = self.batch_get_signatures(scan_order, {w: _state_last_sig(state.get(w)) for w in scan_order})
+            scan_results = self.executor.map(lambda w: self._scan_wallet(w, state.get(w, {}), first_pages.get(w)), scan_order)
+            for wallet, new_sigs in zip(scan_order, scan_results):
                 if new_sigs:
-                    main_logger.info(f"-> {len(new_sigs)} neue Transaktion(en) für {wallet} gefunden.")
-                    for s in new_sigs: signatures_found_in_run[s.signature] = s
-                    if not isinstance(state.get(wallet), dict): state[wallet] = {}
-                    state[wallet]['last_sig'] = str(new_sigs[-1].signature)
-                wallets_scanned_in_run.add(wallet)
+                    main_logger.info("-> %s neue Transaktion(en) für %s gefunden.", len(new_sigs), wallet)
+                    pending.extend(new_sigs)
+                    new_sigs_by_wallet[wallet] = new_sigs
 
-            new_signatures_to_process = set(signatures_found_in_run.keys()) - signatures_processed_in_run
+            # Jede Signatur wird genau einmal entnommen; Duplikate (Sender und Empfänger
+            # überwacht) fängt der Dict-Schlüssel ab, Bekanntes das processed-Set.
+            new_signatures_to_process = {}
+            while pending:
+                sig_info = pending.popleft()
+                key = bytes(sig_info.signature)
+                if key in processed_sigs or key in unfetched_in_run: continue
+                new_signatures_to_process.setdefault(key, sig_info)
             if not new_signatures_to_process:
                 main_logger.info("Keine neuen Transaktionen in diesem Pass zu analysieren.")
                 if pass_num > 1: break 
                 pass_num += 1; continue
             
-            main_logger.info(f"Analysiere {len(new_signatures_to_process)} neue, einzigartige Transaktionen...")
+            main_logger.info("Analysiere %s neue, einzigartige Transaktionen...", len(new_signatures_to_process))
             initial_greylist_size = len(self.greylist)
-            sorted_sigs = sorted([signatures_found_in_run[s] for s in new_signatures_to_process], key=lambda si: si.block_time or 0)
+            sorted_sigs = list(new_signatures_to_process.items())
+            sorted_sigs.sort(key=lambda item: item[1].block_time or 0)
             
             total_tx = len(sorted_sigs)
-            for i, sig_info in enumerate(sorted_sigs):
-                if not self.debug_mode:
-                    progress = (i + 1) / total_tx
-                    bar = '█' * int(40 * progress) + '-' * (40 - int(40 * progress))
-                    sys.stdout.write(f'\rPass #{pass_num} Fortschritt: [{bar}] {i+1}/{total_tx} ({progress:.0%})')
-                    sys.stdout.flush()
-                main_logger.debug(f"Analysiere TX {i+1}/{len(sorted_sigs)}: {sig_info.signature}")
-                self.analyze_transaction(sig_info.signature, sig_info.block_time, monitored_now, state)
-                signatures_processed_in_run.add(sig_info.signature)
+            # Pro Fenster werden so viele Batches gleichzeitig geladen, wie der Pool Worker hat.
+            fetch_window = self.batch_size * self.max_workers
+            windows = [sorted_sigs[start:start + fetch_window] for start in range(0, total_tx, fetch_window)]
+            i = 0
+            # Die Analyse bleibt seriell (Greylist/Status hängen von der zeitlichen Reihenfolge ab);
+            # währenddessen lädt ein eigener Thread bereits das nächste Fenster. Nicht self.executor,
+            # da _rpc_batch dessen Worker für die Teil-Batches braucht.
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="tx-prefetch") as prefetch:
+                next_fetch = prefetch.submit(self.get_transactions_with_retries, [si.signature for _, si in windows[0]])
+                for w_idx, window in enumerate(windows):
+                    tx_responses = next_fetch.result()
+                    if w_idx + 1 < len(windows):
+                        next_fetch = prefetch.submit(self.get_transactions_with_retries, [si.signature for _, si in windows[w_idx + 1]])
+                    for key, sig_info in window:
+                        i += 1
+                        if not self.debug_mode:
+                            progress = i / total_tx
+                            bar = '█' * int(40 * progress) + '-' * (40 - int(40 * progress))
+                            sys.stdout.write(f'\rPass #{pass_num} Fortschritt: [{bar}] {i}/{total_tx} ({progress:.0%})')
+                            sys.stdout.flush()
+                        main_logger.debug("Analysiere TX %s/%s: %s", i, total_tx, sig_info.signature)
+                        tx_resp = tx_responses.get(sig_info.signature)
+                        self.analyze_transaction(sig_info.signature, sig_info.block_time, monitored_now, state, tx_resp)
+                        (processed_sigs if tx_resp is not None else unfetched_in_run).add(key)
             
             if not self.debug_mode: sys.stdout.write('\n')
+            self._wait_for_freezes()
+            self._flush_log_events()
             if len(self.greylist) == initial_greylist_size:
                 main_logger.info("Keine neuen Greylist-Wallets entdeckt. Beende den Prüfungslauf.")
                 break
+            monitored_now = self.whitelist | self.greylist
             pass_num += 1
 
+        self._advance_last_sigs(state, new_sigs_by_wallet, unfetched_in_run)
         main_logger.info("Alle Pässe abgeschlossen. Aktualisiere finale Kontostände im Status...")
-        final_monitored = self.whitelist.union(self.greylist)
-        for wallet in sorted(list(final_monitored)):
-            balance = self.get_token_balance(wallet)
+        final_monitored = self.whitelist | self.greylist
+        final_balances = self.batch_get_token_balances(list(final_monitored))
+        for wallet, balance in final_balances.items():
             if balance is not None:
                 if not isinstance(state.get(wallet), dict):
                     state[wallet] = {'last_sig': state.get(wallet), 'last_balance': None}
@@ -570,11 +1324,75 @@ class PeriodicChecker:
         
         save_state(state)
         save_greylist(self.greylist)
-        visualizer = NetworkVisualizer(TRANSACTION_LOG_FILE, self.whitelist, self.greylist, str(self.payer_keypair.pubkey()))
-        visualizer.generate_graph()
-        if self.perform_validation: self._perform_supply_validation(final_monitored)
+        save_processed_signatures(processed_sigs)
+        # Mit Validierung wird das Log einmal aggregiert und an beide Verbraucher gereicht;
+        # ohne bleibt es beim Laden im Visualizer (entfällt bei unverändertem Log ganz).
+        aggregates = load_log_aggregates(TRANSACTION_LOG_FILE) if self.perform_validation else None
+        visualizer = NetworkVisualizer(TRANSACTION_LOG_FILE, self.whitelist, self.greylist, self.payer_str)
+        visualizer.generate_graph(aggregates)
+        if self.perform_validation: self._perform_supply_validation(final_balances, aggregates)
         main_logger.info("Prüfungslauf abgeschlossen.")
 
+    async def run_check_async(self):
+        """Führt run_check in einem Daemon-Thread aus, damit die Event-Loop (Ctrl-C, Timer) reaktiv bleibt."""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def _resolve(result=None, error=None):
+            if done.done(): return
+            if error is not None: done.set_exception(error)
+            else: done.set_result(result)
+
+        def _worker():
+            try:
+                result = self.run_check()
+            except Exception as e:
+                loop.call_soon_threadsafe(_resolve, None, e)
+            else:
+                loop.call_soon_threadsafe(_resolve, result)
+
+        # Daemon-Thread: Bei Abbruch wartet der Prozess nicht auf laufende RPC-Aufrufe.
+        threading.Thread(target=_worker, name="run_check", daemon=True).start()
+        return await done
+
+async def _check_loop(checker: PeriodicChecker, interval: int):
+    # Feste Taktung über monotone Deadlines: die Dauer eines Laufs verschiebt den nächsten Start nicht.
+    next_tick = time.monotonic()
+    fail_count = 0
+    while True:
+        try:
+            await checker.run_check_async()
+            fail_count = 0
+            next_tick += interval * 60
+            sleep_for = next_tick - time.monotonic()
+            if sleep_for > 0:
+                main_logger.info("Prüfung abgeschlossen. Nächste Prüfung in %.1f Minuten.", sleep_for / 60)
+                await asyncio.sleep(sleep_for)
+            else:
+                main_logger.warning("Prüfungslauf hat das Intervall um %.1fs überschritten. Starte sofort neu.", -sleep_for)
+                next_tick = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            main_logger.critical("Ein kritischer Fehler in der Hauptschleife aufgetreten:", exc_info=True)
+            # Exponentieller Backoff (gedeckelt auf das Intervall) mit Jitter gegen synchrone Retry-Wellen.
+            delay = min(interval * 60, 30 * (2 ** fail_count)) + random.uniform(0, 15)
+            fail_count += 1
+            main_logger.info("Fehlversuch #%s. Warte %.0fs und versuche es erneut...", fail_count, delay)
+            await asyncio.sleep(delay)
+            next_tick = time.monotonic()
+
+async def main(checker: PeriodicChecker, interval: int):
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGINT, task.cancel)
+    except NotImplementedError:
+        pass  # Windows: Ctrl-C kommt weiterhin als KeyboardInterrupt an.
+    try:
+        await _check_loop(checker, interval)
+    except asyncio.CancelledError:
+        main_logger.info("\nSkript wird durch Benutzer beendet.")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Periodischer Solana Whitelist/Greylist-Prüfer.")
     parser.add_argument("--debug", action="store_true", help="Aktiviert detaillierte Debug-Ausgaben.")
@@ -586,18 +1404,17 @@ if __name__ == "__main__":
 
     main_logger = setup_logger('main_checker', MAIN_LOG_FILE, debug_mode=args.debug)
     os.makedirs(ANALYSE_FOLDER, exist_ok=True)
-    checker = PeriodicChecker(debug_mode=args.debug, freeze_sender=args.freezesend, freeze_recipient=args.freezereceive, validate=args.validate)
+    http_session = create_http_session()
+    checker = PeriodicChecker(debug_mode=args.debug, freeze_sender=args.freezesend, freeze_recipient=args.freezereceive, validate=args.validate, http_session=http_session)
     
-    while True:
-        try:
-            checker.run_check()
-            interval = args.interval
-            print(f"\nPrüfung um {datetime.now():%H:%M:%S} abgeschlossen. Nächste Prüfung in {interval} Minuten.")
-            time.sleep(interval * 60)
-        except KeyboardInterrupt:
-            main_logger.info("\nSkript wird durch Benutzer beendet.")
-            sys.exit(0)
-        except Exception as e:
-            main_logger.critical(f"Ein kritischer Fehler in der Hauptschleife aufgetreten: {e}\n{traceback.format_exc()}")
-            main_logger.info("Warte 5 Minuten und versuche es erneut...")
-            time.sleep(300)
+    try:
+        asyncio.run(main(checker, args.interval))
+    except KeyboardInterrupt:
+        main_logger.info("\nSkript wird durch Benutzer beendet.")
+    checker.close()
+    # Noch wartende Wallet-Scans verwerfen, damit der Exit nicht auf sie wartet.
+    checker.executor.shutdown(wait=False, cancel_futures=True)
+    if checker._hedge_pool: checker._hedge_pool.shutdown(wait=False, cancel_futures=True)
+    checker._freeze_pool.shutdown(wait=False, cancel_futures=True)
+    http_session.close()
+    sys.exit(0)
@@ -15,6 +15,7 @@ import os
 import sys
 import json
 import webbrowser
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Callable
 import struct
 from base64 import b64decode
@@ -52,6 +53,17 @@ class DesignSystem:
 
 class StatusIndicator(ctk.CTkFrame):
     """Ein UI-Element zur Anzeige eines Status mit Icon und Text."""
+    _ICON_MAP = {
+        "success": DesignSystem.ICONS['success'], "error": DesignSystem.ICONS['error'],
+        "warning": DesignSystem.ICONS['warning'], "info": DesignSystem.ICONS['info'],
+        "loading": DesignSystem.ICONS['spinner'], "unknown": "❔"
+    }
+    _COLOR_MAP = {
+        "success": DesignSystem.COLORS['success'], "error": DesignSystem.COLORS['error'],
+        "warning": DesignSystem.COLORS['warning'], "info": DesignSystem.COLORS['text_secondary'],
+        "loading": DesignSystem.COLORS['info'], "unknown": DesignSystem.COLORS['text_secondary']
+    }
+
     def __init__(self, master, status="unknown", text=""):
         super().__init__(master, fg_color="transparent")
         self.status_icon = ctk.CTkLabel(self, text="")
@@ -61,18 +73,8 @@ class StatusIndicator(ctk.CTkFrame):
         self.set_status(status, text)
 
     def set_status(self, status, text):
-        icon_map = {
-            "success": DesignSystem.ICONS['success'], "error": DesignSystem.ICONS['error'],
-            "warning": DesignSystem.ICONS['warning'], "info": DesignSystem.ICONS['info'],
-            "loading": DesignSystem.ICONS['spinner'], "unknown": "❔"
-        }
-        color_map = {
-            "success": DesignSystem.COLORS['success'], "error": DesignSystem.COLORS['error'],
-            "warning": DesignSystem.COLORS['warning'], "info": DesignSystem.COLORS['text_secondary'],
-            "loading": DesignSystem.COLORS['info'], "unknown": DesignSystem.COLORS['text_secondary']
-        }
-        self.status_icon.configure(text=icon_map.get(status, "❔"))
-        self.status_label.configure(text=text, text_color=color_map.get(status, "white"))
+        self.status_icon.configure(text=self._ICON_MAP.get(status, "❔"))
+        self.status_label.configure(text=text, text_color=self._COLOR_MAP.get(status, "white"))
 
 class CopyableLabel(ctk.CTkFrame):
     """Ein Label mit einem Button zum Kopieren des Inhalts."""
@@ -176,13 +178,28 @@ except ImportError as e:
     messagebox.showerror("Fehler: Fehlende Bibliotheken", f"Eine oder mehrere erforderliche Python-Bibliotheken fehlen. ({e})\n\nBitte installieren Sie diese mit:\npip install solana solders spl-token-py customtkinter")
     sys.exit(1)
 
+# orjson ist optional: schnelleres Parsen von config.json und den Wallet-Dateien.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # === HILFSFUNKTIONEN ===
 TOKEN_METADATA_PROGRAM_ID = Pubkey.from_string("metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
 
+def _parse_json_file(path: str):
+    with open(path, 'rb') as f: raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+@lru_cache(maxsize=64)
+def _read_json(path: str, mtime_ns: int):
+    """Liest und parst eine JSON-Datei; über mtime als Cache-Schlüssel werden geänderte Dateien neu gelesen."""
+    return _parse_json_file(path)
+
 def load_config():
     """Lädt die Konfiguration aus der config.json-Datei."""
     try:
-        with open("config.json", 'r') as f: return json.load(f)
+        return _read_json("config.json", os.stat("config.json").st_mtime_ns)
     except FileNotFoundError:
         messagebox.showerror("Fehler", "Kritischer Fehler: 'config.json' nicht gefunden.")
         sys.exit(1)
@@ -190,13 +207,23 @@ def load_config():
         messagebox.showerror("Fehler", "Kritischer Fehler: 'config.json' ist fehlerhaft formatiert.")
         sys.exit(1)
 
+# Prozessweiter Keypair-Cache (Pfad, mtime) -> Keypair; gesperrt, da run_in_thread aus Hintergrund-Threads lädt.
+_KEYPAIR_CACHE: Dict[Tuple[str, int], Keypair] = {}
+_KEYPAIR_CACHE_LOCK = threading.Lock()
+
 def load_keypair(wallet_folder: str, filename: str) -> Keypair | None:
     """Lädt ein Keypair aus einer JSON-Datei in einem bestimmten Ordner."""
     path = os.path.join(wallet_folder, filename)
     if not os.path.exists(path):
         messagebox.showerror("Fehler", f"Essentielle Wallet-Datei '{path}' nicht gefunden.\n\nBitte zuerst setup.py ausführen.")
         return None
-    with open(path, 'r') as f: return Keypair.from_bytes(bytes(json.load(f)))
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    with _KEYPAIR_CACHE_LOCK:
+        keypair = _KEYPAIR_CACHE.get(key)
+        if keypair is None:
+            # Ungecacht lesen: der Schlüssel soll nur einmal (als Keypair) im Speicher liegen, nicht zusätzlich im lru_cache.
+            keypair = _KEYPAIR_CACHE[key] = Keypair.from_bytes(bytes(_parse_json_file(path)))
+    return keypair
 
 # === HAUPTANWENDUNG ===
 class SolanaTokenUI(ctk.CTk):
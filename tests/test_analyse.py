@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+pytest.importorskip("solders")
+# analyse.py liest config.json beim Import aus dem Arbeitsverzeichnis.
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import analyse  # noqa: E402
+
+VALID = "11111111111111111111111111111111"
+
+
+def test_load_whitelist_drops_invalid_entries(tmp_path, monkeypatch):
+    (tmp_path / "whitelist.txt").write_text(f"# Kommentar\n{VALID}\nkeine-adresse\n\n", encoding="utf-8")
+    monkeypatch.setattr(analyse, "WALLET_FOLDER", str(tmp_path))
+    monkeypatch.setattr(analyse, "_whitelist_cache", {'key': None, 'wallets': frozenset()})
+    assert analyse.load_whitelist() == frozenset({VALID})
+
+
+def test_load_greylist_drops_invalid_entries(tmp_path, monkeypatch):
+    greylist = tmp_path / "greylist.json"
+    greylist.write_text(f'["{VALID}", "0OIl", 42]', encoding="utf-8")
+    monkeypatch.setattr(analyse, "GREYLIST_FILE", str(greylist))
+    assert analyse.load_greylist() == {VALID}
@@ -8,11 +8,16 @@ import json
 import os
 import sys
 import logging
+import logging.handlers
+import atexit
 import random
 import argparse
 import base64
 import binascii
-from typing import List, Optional
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
 # --- Solana-Bibliotheken ---
 try:
@@ -20,9 +25,11 @@ try:
     from solders.pubkey import Pubkey
     from solders.transaction import Transaction
     from solders.system_program import transfer, TransferParams
+    from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+    from solders.transaction_status import TransactionConfirmationStatus
     from solana.rpc.api import Client
     # from solana.rpc.types import TxOpts, Commitment, GetAccountInfoOpts # For newer solana-py
-    from solana.rpc.types import TxOpts, Commitment # Adjusted for solana==0.36.6
+    from solana.rpc.types import TxOpts, Commitment, DataSliceOpts # Adjusted for solana==0.36.6
     from solana.rpc.core import RPCException
     from solana.exceptions import SolanaRpcException
     from spl.token.instructions import get_associated_token_address, create_associated_token_account, transfer_checked, TransferCheckedParams
@@ -36,6 +43,25 @@ except ImportError as e:
     print("pip install --upgrade solders solana spl-token httpx")
     sys.exit(1)
 
+# orjson ist optional: schnelleres Parsen der Wallet-Dateien im alten Listenformat.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pybase64 ist optional: SIMD-beschleunigtes Base64 beim Laden und Speichern der Wallet-Dateien.
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+# h2 ist optional: HTTP/2 multiplext alle (auch parallele) RPC-Aufrufe über eine Verbindung.
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # --- Konfiguration ---
 def load_config():
     try:
@@ -61,6 +87,18 @@ LOG_FOLDER = "generic_transactions"
 GENERATED_WALLET_FOLDER = os.path.join(LOG_FOLDER, "generated_wallets") # Ordner für neue Wallets
 TRANSACTION_LOG_FILE = os.path.join(LOG_FOLDER, "sent_transactions.log")
 
+# --- Prozessweite Caches ---
+# Einmal angelegte ATAs verschwinden in diesem Ablauf nicht mehr; Token-Salden gelten kurz als aktuell.
+BALANCE_CACHE_TTL = 10.0 # Sekunden
+_ATA_EXISTS: Set[Pubkey] = set()
+_BALANCE_CACHE: Dict[Tuple[Pubkey, Pubkey], Tuple[float, float]] = {} # (owner, mint) -> (saldo, zeitstempel)
+
+# --- Compute-Budget ---
+# Knapp bemessene CU-Limits halten die Prioritätsgebühr (Preis x Limit) klein.
+CU_LIMIT_SOL_TRANSFER = 5_000
+CU_LIMIT_TOKEN_TRANSFER = 80_000 # reicht für SOL-Aufladung + ATA-Erstellung + transfer_checked
+PRIORITY_FEE_MICRO_LAMPORTS = 10_000 # Micro-Lamports pro CU, wird in main aus --priority-fee gesetzt
+
 # --- Logging Setup ---
 def setup_logger():
     os.makedirs(LOG_FOLDER, exist_ok=True)
@@ -79,8 +117,13 @@ def setup_logger():
     file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(file_formatter)
 
+    # Datei-Schreibzugriffe bündeln: INFO-Einträge werden gesammelt und erst bei 64 Einträgen,
+    # einem ERROR oder beim Beenden in die Log-Datei geschrieben.
+    memory_handler = logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.ERROR, target=file_handler)
+    atexit.register(memory_handler.flush)
+
     logger.addHandler(stream_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(memory_handler)
     
     return logger
 
@@ -93,40 +136,50 @@ def truncate_address(address: str, chars: int = 4) -> str:
         return address
     return f"{address[:chars]}...{address[-chars:]}"
 
+@lru_cache(maxsize=4096)
+def short_address(pubkey: Pubkey) -> str:
+    """Gekürzte Anzeige eines Pubkeys; das Base58-Encoding wird pro Adresse nur einmal berechnet."""
+    return truncate_address(str(pubkey))
+
 def load_keypair_from_path(path: str) -> Keypair:
     """Lädt ein Keypair aus einer JSON-Datei (unterstützt altes Listen- und neues Base64-Format)."""
-    with open(path, 'r') as f:
-        data = json.load(f)
+    return _load_keypair_cached(path, os.stat(path).st_mtime_ns)
+
+@lru_cache(maxsize=4096)
+def _load_keypair_cached(path: str, mtime_ns: int) -> Keypair:
+    # Schlüssel über Pfad + mtime: unveränderte Wallet-Dateien werden beim erneuten Laden nicht neu geparst.
+    with open(path, 'rb') as f:
+        raw = f.read().strip()
 
-    if isinstance(data, str):
+    # Base64-Format: ein JSON-String ohne Escapes, die Anführungszeichen werden direkt abgeschnitten.
+    if len(raw) >= 2 and raw[:1] == b'"' and raw[-1:] == b'"':
+        data = raw[1:-1]
+    else:
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+
+    if isinstance(data, (bytes, str)):
         try:
-            b64_secret = data.encode('ascii')
-            secret_bytes = base64.b64decode(b64_secret)
+            b64_secret = data if isinstance(data, bytes) else data.encode('ascii')
+            secret_bytes = pybase64.b64decode(b64_secret, validate=True) if pybase64 else base64.b64decode(b64_secret, validate=True)
             if len(secret_bytes) != 64:
                  raise ValueError(f"Dekodierter Base64-Schlüssel aus {path} hat eine falsche Länge: {len(secret_bytes)}")
             return Keypair.from_bytes(secret_bytes)
         except (ValueError, binascii.Error) as e:
-            logger.error(f"Fehler beim Dekodieren des Base64-Schlüssels in {path}: {e}")
+            logger.error("Fehler beim Dekodieren des Base64-Schlüssels in %s: %s", path, e)
             raise e
 
     elif isinstance(data, list):
         try:
             secret_bytes = bytes(data)
-            if len(secret_bytes) == 32: # Old format from_seed
-                # In solders 0.26.0, from_seed expects a list of 32 u8s, not bytes directly.
-                # Keypair.from_seed expects List[int] or bytes of length 32
-                # However, from_bytes(bytes_of_length_64) is more common for full keypairs
-                # If it's a 32-byte seed, we need to handle it properly.
-                # The original code did: Keypair.from_bytes(Keypair.from_seed(secret_bytes).to_bytes())
-                # This seems correct if secret_bytes is a 32-byte seed.
-                kp_from_seed = Keypair.from_seed(secret_bytes)
-                return Keypair.from_bytes(kp_from_seed.to_bytes())
-            elif len(secret_bytes) == 64: # Standard full keypair bytes
+            if len(secret_bytes) == 64: # Standard full keypair bytes
                 return Keypair.from_bytes(secret_bytes)
+            elif len(secret_bytes) == 32: # Old format from_seed
+                # from_seed liefert bereits das vollständige Keypair, kein Umweg über to_bytes()/from_bytes().
+                return Keypair.from_seed(secret_bytes)
             else:
                  raise ValueError(f"Schlüssel aus Liste in {path} hat eine falsche Länge: {len(secret_bytes)}")
         except ValueError as e:
-            logger.error(f"Fehler beim Verarbeiten des alten Schlüsselformats in {path}: {e}")
+            logger.error("Fehler beim Verarbeiten des alten Schlüsselformats in %s: %s", path, e)
             raise e
     else:
         raise TypeError(f"Unbekanntes oder ungültiges Key-Format in {path}.")
@@ -134,16 +187,16 @@ def load_keypair_from_path(path: str) -> Keypair:
 def load_all_keypairs(folder_path: str) -> List[Keypair]:
     keypairs = []
     if not os.path.isdir(folder_path):
-        logger.warning(f"Wallet-Ordner '{folder_path}' nicht gefunden!")
+        logger.warning("Wallet-Ordner '%s' nicht gefunden!", folder_path)
         return []
     
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".json"):
-            try:
-                path = os.path.join(folder_path, filename)
-                keypairs.append(load_keypair_from_path(path))
-            except Exception as e:
-                logger.error(f"Konnte {filename} nicht laden ({e}), wird übersprungen.")
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                try:
+                    keypairs.append(_load_keypair_cached(entry.path, entry.stat().st_mtime_ns))
+                except Exception as e:
+                    logger.error("Konnte %s nicht laden (%s), wird übersprungen.", entry.name, e)
     return keypairs
 
 def create_and_save_keypair(layer: int) -> Keypair:
@@ -152,38 +205,115 @@ def create_and_save_keypair(layer: int) -> Keypair:
     os.makedirs(layer_folder, exist_ok=True)
     
     filepath = os.path.join(layer_folder, f"{kp.pubkey()}.json")
-    with open(filepath, 'w') as f:
-        secret_bytes = kp.to_bytes()
-        b64_secret = base64.b64encode(secret_bytes)
-        b64_string = b64_secret.decode('ascii')
-        json.dump(b64_string, f)
+    secret_bytes = kp.to_bytes()
+    b64_secret = pybase64.b64encode(secret_bytes) if pybase64 else base64.b64encode(secret_bytes)
+    # Base64 enthält keine JSON-Escapes: identisch zu json.dump(b64_string), aber ohne Text-Encoding.
+    with open(filepath, 'wb') as f:
+        f.write(b'"' + b64_secret + b'"')
         
-    logger.info(f"Neues Wallet erstellt und gespeichert: {kp.pubkey()} in '{layer_folder}'")
+    logger.info("Neues Wallet erstellt und gespeichert: %s in '%s'", kp.pubkey(), layer_folder)
     return kp
 
+@lru_cache(maxsize=4096)
+def ata_address(owner_pubkey: Pubkey, mint_pubkey: Pubkey) -> Pubkey:
+    """ATA-Adresse zu (Owner, Mint); die PDA-Ableitung (find_program_address) läuft pro Paar nur einmal."""
+    return get_associated_token_address(owner_pubkey, mint_pubkey)
+
 def get_token_balance(client: Client, owner_pubkey: Pubkey, mint_pubkey: Pubkey) -> Optional[float]:
-    ata = get_associated_token_address(owner_pubkey, mint_pubkey)
+    cache_key = (owner_pubkey, mint_pubkey)
+    cached = _BALANCE_CACHE.get(cache_key)
+    if cached is not None and time.time() - cached[1] < BALANCE_CACHE_TTL:
+        return cached[0]
+
+    ata = ata_address(owner_pubkey, mint_pubkey)
     for attempt in range(4): 
         try:
-            balance_resp = client.get_token_account_balance(ata, commitment=Commitment("confirmed"))
-            if balance_resp.value.ui_amount is None:
-                return 0.0
-            return balance_resp.value.ui_amount
-        except RPCException as e:
-            if "Invalid param: could not find account" in str(e):
-                if attempt < 3: 
-                    logger.warning(f"Versuch {attempt + 1}: Token-Konto {truncate_address(str(ata))} noch nicht gefunden. Warte 5 Sekunden...")
-                    time.sleep(5)
-                else: 
-                    logger.error(f"Konnte Token-Konto {truncate_address(str(ata))} nach mehreren Versuchen nicht finden.")
-                    return 0.0 
-            else: 
-                logger.error(f"Unerwarteter RPC-Fehler bei get_token_balance für {truncate_address(str(ata))} (Versuch {attempt+1}): {e}")
-                if attempt == 3: 
-                    raise e 
-                time.sleep(5) 
+            # getAccountInfo liefert für ein fehlendes Konto value=None statt eines Fehlers.
+            account = client.get_account_info_json_parsed(ata, commitment=Commitment("confirmed")).value
+        except (RPCException, SolanaRpcException) as e:
+            logger.error("Unerwarteter RPC-Fehler bei get_token_balance für %s (Versuch %d): %s", short_address(ata), attempt + 1, e)
+            if attempt == 3: 
+                raise e 
+            time.sleep(2 ** attempt) 
+            continue
+
+        if account is None:
+            # Nur ein bekanntermaßen angelegtes ATA kann auf dem RPC-Knoten noch kurz fehlen; sonst gibt es kein Guthaben.
+            if ata in _ATA_EXISTS and attempt < 3:
+                logger.warning("Versuch %d: Token-Konto %s noch nicht sichtbar. Warte 2 Sekunden...", attempt + 1, short_address(ata))
+                time.sleep(2)
+                continue
+            return 0.0
+
+        token_amount = account.data.parsed["info"]["tokenAmount"]
+        balance = int(token_amount["amount"]) / (10 ** token_amount["decimals"])
+        _ATA_EXISTS.add(ata)
+        _BALANCE_CACHE[cache_key] = (balance, time.time())
+        return balance
     return 0.0 
 
+class BlockhashCache:
+    """Hält den letzten Blockhash vor; er ist ca. 60s (150 Slots) gültig, erneuert wird nach 45s."""
+    def __init__(self, max_age: float = 45.0):
+        self.max_age = max_age
+        self._blockhash = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, client: Client):
+        with self._lock:
+            if self._blockhash is None or time.time() - self._fetched_at >= self.max_age:
+                self._blockhash = client.get_latest_blockhash().value.blockhash
+                self._fetched_at = time.time()
+            return self._blockhash
+
+    def invalidate(self):
+        with self._lock:
+            self._blockhash = None
+
+_BLOCKHASH_CACHE = BlockhashCache()
+
+def _land(client: Client, signature, timeout: float = 30.0, poll_interval: float = 0.4):
+    """Wartet per getSignatureStatuses, bis die Transaktion 'confirmed' ist; Fehler auf der Chain werden als Exception gemeldet."""
+    deadline = time.time() + timeout
+    while True:
+        status = client.get_signature_statuses([signature]).value[0]
+        if status is not None:
+            if status.err is not None:
+                raise RuntimeError(f"Transaktion {signature} fehlgeschlagen: {status.err}")
+            if status.confirmation_status in (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized):
+                return
+        if time.time() >= deadline:
+            raise TimeoutError(f"Transaktion {signature} wurde nicht innerhalb von {timeout:.0f}s bestätigt.")
+        time.sleep(poll_interval)
+
+def send_signed_transaction(client: Client, instructions: List, payer: Keypair, signers: List[Keypair]):
+    """Signiert mit dem gecachten Blockhash, sendet und wartet auf 'confirmed'; bei 'Blockhash not found' einmal mit frischem Blockhash."""
+    # Der Preflight bleibt aktiv (fängt Simulationsfehler und unbekannte Blockhashes ab); bestätigt
+    # wird nur noch einmal über _land statt zusätzlich serverseitig in send_transaction.
+    tx_opts = TxOpts(skip_confirmation=True, preflight_commitment=Commitment("confirmed"))
+    for attempt in range(2):
+        transaction = Transaction.new_signed_with_payer(instructions, payer.pubkey(), signers, _BLOCKHASH_CACHE.get(client))
+        try:
+            resp = client.send_transaction(transaction, opts=tx_opts)
+            break
+        except (RPCException, SolanaRpcException) as e:
+            if attempt == 0 and "blockhash not found" in str(e).lower():
+                logger.warning("Blockhash abgelaufen oder unbekannt. Hole neuen Blockhash und sende erneut...")
+                _BLOCKHASH_CACHE.invalidate()
+                continue
+            raise
+    signature = resp.value
+    _land(client, signature)
+    return signature
+
+def compute_budget_instructions(cu_limit: int) -> List:
+    """Erzeugt die Compute-Budget-Instruktionen (CU-Limit und Prioritätsgebühr), die jeder Transaktion vorangestellt werden."""
+    instructions = [set_compute_unit_limit(cu_limit)]
+    if PRIORITY_FEE_MICRO_LAMPORTS > 0:
+        instructions.append(set_compute_unit_price(PRIORITY_FEE_MICRO_LAMPORTS))
+    return instructions
+
 def fund_with_sol(client: Client, payer: Keypair, recipient_pubkey: Pubkey, sol_amount: float = 0.003) -> str:
     lamports = int(sol_amount * 1_000_000_000)
     
@@ -195,62 +325,88 @@ def fund_with_sol(client: Client, payer: Keypair, recipient_pubkey: Pubkey, sol_
         )
     )
     
-    latest_blockhash_resp = client.get_latest_blockhash()
-    transaction = Transaction.new_signed_with_payer(
-        [instruction],
-        payer.pubkey(),
-        [payer],
-        latest_blockhash_resp.value.blockhash
-    )
-    
-    tx_opts = TxOpts(skip_confirmation=False, preflight_commitment=Commitment("confirmed"))
-    resp = client.send_transaction(transaction, opts=tx_opts)
-    signature = resp.value
-    client.confirm_transaction(signature, commitment=Commitment("confirmed"))
+    signature = send_signed_transaction(client, compute_budget_instructions(CU_LIMIT_SOL_TRANSFER) + [instruction], payer, [payer])
     
-    logger.info(f"Wallet {truncate_address(str(recipient_pubkey))} mit {sol_amount} SOL aufgeladen. Signatur: {signature}")
+    logger.info("Wallet %s mit %s SOL aufgeladen. Signatur: %s", short_address(recipient_pubkey), sol_amount, signature)
     return str(signature)
 
-def send_token_transfer(client: Client, payer: Keypair, sender: Keypair, recipient_pubkey: Pubkey, mint_pubkey: Pubkey, amount_raw: int, decimals: int) -> str:
+def fetch_wallet_balances(client: Client, owners: List[Pubkey], mint_pubkey: Pubkey, decimals: int) -> Dict[Pubkey, Tuple[float, int]]:
+    """Liest Token- und SOL-Saldo vieler Wallets gebündelt per getMultipleAccounts (ATA + Owner je Wallet, max. 100 Konten pro Aufruf)."""
+    balances = {}
+    now = time.time()
+    for start in range(0, len(owners), 50):
+        chunk = owners[start:start + 50]
+        atas = [ata_address(o, mint_pubkey) for o in chunk]
+        # SPL-Token-Konto: mint (32) | owner (32) | amount (u64, little-endian) -> per dataSlice nur die 8 Byte
+        # des Betrags übertragen; für die Owner-Konten (System-Konten) zählen ohnehin nur die Lamports.
+        accounts = client.get_multiple_accounts(atas + chunk, commitment=Commitment("confirmed"), data_slice=DataSliceOpts(offset=64, length=8)).value
+        for i, owner in enumerate(chunk):
+            ata_account, owner_account = accounts[i], accounts[len(chunk) + i]
+            token_bal = 0.0
+            if ata_account is not None:
+                token_bal = int.from_bytes(bytes(ata_account.data), 'little') / (10 ** decimals)
+                _ATA_EXISTS.add(atas[i])
+                _BALANCE_CACHE[(owner, mint_pubkey)] = (token_bal, now)
+            balances[owner] = (token_bal, owner_account.lamports if owner_account is not None else 0)
+    return balances
+
+def send_token_transfer(client: Client, payer: Keypair, sender: Keypair, recipient_pubkey: Pubkey, mint_pubkey: Pubkey, amount_raw: int, decimals: int, recipient_ata_exists: Optional[bool] = None, sol_fund_lamports: int = 0) -> str:
     if amount_raw <= 0:
         logger.warning("Transfermenge ist Null oder negativ. Überspringe.")
         return ""
 
-    sender_ata = get_associated_token_address(sender.pubkey(), mint_pubkey)
-    recipient_ata = get_associated_token_address(recipient_pubkey, mint_pubkey)
+    sender_ata = ata_address(sender.pubkey(), mint_pubkey)
+    recipient_ata = ata_address(recipient_pubkey, mint_pubkey)
     
-    instructions = []
+    instructions = compute_budget_instructions(CU_LIMIT_TOKEN_TRANSFER)
+    # Optionale SOL-Aufladung des Empfängers durch den Payer in derselben Transaktion.
+    if sol_fund_lamports > 0:
+        instructions.append(
+            transfer(
+                TransferParams(
+                    from_pubkey=payer.pubkey(),
+                    to_pubkey=recipient_pubkey,
+                    lamports=sol_fund_lamports
+                )
+            )
+        )
     
     recipient_account_info_value = None
     max_retries = 4
     retry_delay = 7 
 
+    # Ist die ATA-Existenz bereits bekannt (frisch erzeugtes Wallet oder früherer Transfer),
+    # entfällt die Einzelabfrage.
+    if recipient_ata_exists is None and recipient_ata in _ATA_EXISTS:
+        recipient_ata_exists = True
+    if recipient_ata_exists is not None:
+        recipient_account_info_value = recipient_ata_exists
+        max_retries = 0
+
     for attempt in range(max_retries):
         try:
-            logger.info(f"Versuch {attempt + 1}/{max_retries}: Rufe Kontoinformationen für ATA {truncate_address(str(recipient_ata))} ab...")
+            logger.info("Versuch %d/%d: Rufe Kontoinformationen für ATA %s ab...", attempt + 1, max_retries, short_address(recipient_ata))
             # MODIFIED for solana==0.36.6: Pass commitment directly
             resp = client.get_account_info(recipient_ata, commitment=Commitment("confirmed"))
             recipient_account_info_value = resp.value
-            logger.info(f"Kontoinformationen für ATA {truncate_address(str(recipient_ata))} erfolgreich abgerufen (Versuch {attempt + 1}).")
+            logger.info("Kontoinformationen für ATA %s erfolgreich abgerufen (Versuch %d).", short_address(recipient_ata), attempt + 1)
             break 
         except SolanaRpcException as e:
-            error_message = f"SolanaRpcException bei Versuch {attempt + 1}/{max_retries} für ATA {truncate_address(str(recipient_ata))}: {str(e)[:200]}."
-            if "Invalid param: TokenAccount not found" in str(e) or "could not find account" in str(e): # More specific checks for non-existent account
-                logger.info(f"ATA {truncate_address(str(recipient_ata))} existiert nicht (Versuch {attempt+1}). Wird erstellt.")
-                break # Exit retry loop, account will be created
-            elif attempt < max_retries - 1:
-                logger.warning(f"{error_message} Wiederholung in {retry_delay}s...")
+            # Ein fehlendes ATA kommt als value=None zurück; Exceptions sind hier nur transiente RPC-Fehler.
+            error_message = f"SolanaRpcException bei Versuch {attempt + 1}/{max_retries} für ATA {short_address(recipient_ata)}: {str(e)[:200]}."
+            if attempt < max_retries - 1:
+                logger.warning("%s Wiederholung in %ss...", error_message, retry_delay)
                 time.sleep(retry_delay)
             else:
-                logger.error(f"{error_message} Alle Wiederholungen fehlgeschlagen.")
+                logger.error("%s Alle Wiederholungen fehlgeschlagen.", error_message)
                 raise 
         except Exception as e: 
-            error_message = f"Unerwarteter Fehler bei Versuch {attempt + 1}/{max_retries} für ATA {truncate_address(str(recipient_ata))}: {e}."
+            error_message = f"Unerwarteter Fehler bei Versuch {attempt + 1}/{max_retries} für ATA {short_address(recipient_ata)}: {e}."
             if attempt < max_retries - 1:
-                logger.warning(f"{error_message} Wiederholung in {retry_delay}s...", exc_info=False)
+                logger.warning("%s Wiederholung in %ss...", error_message, retry_delay, exc_info=False)
                 time.sleep(retry_delay)
             else:
-                logger.error(f"{error_message} Alle Wiederholungen fehlgeschlagen.", exc_info=True)
+                logger.error("%s Alle Wiederholungen fehlgeschlagen.", error_message, exc_info=True)
                 raise
 
     # If recipient_account_info_value is still None (e.g., after "TokenAccount not found" or if retries failed but didn't raise)
@@ -258,7 +414,7 @@ def send_token_transfer(client: Client, payer: Keypair, sender: Keypair, recipie
     # A robust check is if recipient_account_info_value is None, or if it is an Account object whose `data` field is empty or indicates no SPL token account.
     # For simplicity, if it's None, we assume it needs creation.
     if not recipient_account_info_value: 
-        logger.info(f"Token-Konto (ATA) {truncate_address(str(recipient_ata))} für Empfänger {truncate_address(str(recipient_pubkey))} existiert nicht oder konnte nicht verifiziert werden. Erstelle es...")
+        logger.info("Token-Konto (ATA) %s für Empfänger %s existiert nicht oder konnte nicht verifiziert werden. Erstelle es...", short_address(recipient_ata), short_address(recipient_pubkey))
         instructions.append(
             create_associated_token_account(
                 payer=sender.pubkey(), 
@@ -282,76 +438,128 @@ def send_token_transfer(client: Client, payer: Keypair, sender: Keypair, recipie
         )
     )
     
-    latest_blockhash_resp = client.get_latest_blockhash()
-    transaction = Transaction.new_signed_with_payer(
-        instructions,
-        payer.pubkey(), 
-        [payer, sender], 
-        latest_blockhash_resp.value.blockhash
-    )
-    
-    tx_opts = TxOpts(skip_confirmation=False, preflight_commitment=Commitment("confirmed"))
-    resp = client.send_transaction(transaction, opts=tx_opts)
-    signature = resp.value
-    client.confirm_transaction(signature, commitment=Commitment("confirmed"))
+    signature = send_signed_transaction(client, instructions, payer, [payer, sender])
+
+    # Der erfolgreiche Transfer belegt das Empfänger-ATA und ändert beide Salden.
+    _ATA_EXISTS.add(recipient_ata)
+    _BALANCE_CACHE.pop((sender.pubkey(), mint_pubkey), None)
+    _BALANCE_CACHE.pop((recipient_pubkey, mint_pubkey), None)
     
     return str(signature)
 
-# --- Hauptlogik --- (run_standard_mode and run_outside_mode remain largely the same, minor logging adjustments for decimals)
-def run_standard_mode(client, payer_keypair, mint_pubkey, decimals, wallets, min_amount, max_amount):
+# --- RPC-Verbindung ---
+def create_http_session() -> "httpx.Client":
+    """Ein gepoolter HTTP-Client für alle RPC-Aufrufe; TCP+TLS wird nur einmal aufgebaut."""
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=75)
+    http2 = HTTP2_AVAILABLE and CONFIG.get("rpc_http2", True)
+    return httpx.Client(timeout=30, limits=limits, http2=http2)
+
+# --- Zyklus-Steuerung ---
+class Backoff:
+    """Adaptive Pause zwischen den Aktionszyklen.
+
+    Nach erfolgreichen Zyklen kehrt die Pause zügig zu --delay zurück und sinkt dann schrittweise
+    bis --min-delay; nach Fehlern verdoppelt sie sich (mindestens auf die fehlerabhängige
+    Untergrenze bzw. Retry-After, höchstens auf 5 Minuten).
+    Geschlafen wird mit ±20% Jitter, damit mehrere Instanzen nicht im Gleichtakt anfragen.
+    """
+    def __init__(self, delay: float, min_delay: float, max_delay: float = 300.0):
+        self.base_delay = float(delay)
+        self.delay = float(delay)
+        self.min_delay = float(min_delay)
+        self.max_delay = max(float(max_delay), self.delay)
+
+    def success(self):
+        if self.delay > self.base_delay:
+            self.delay = max(self.base_delay, self.delay * 0.5)
+        else:
+            self.delay = max(self.min_delay, self.delay * 0.9)
+
+    def failure(self, floor: float = 0.0, retry_after: Optional[float] = None):
+        self.delay = min(self.max_delay, max(self.delay * 2, floor, retry_after or 0.0))
+
+    def sleep(self, minimum: Optional[float] = None):
+        time.sleep(max(minimum or 0.0, random.uniform(0.8 * self.delay, 1.2 * self.delay)))
+
+# Transport-/HTTP-Fehler des RPC-Endpunkts (429, Timeouts, 5xx): werden bis in die Hauptschleife
+# durchgereicht, damit der Backoff greift, statt in den Modus-Funktionen verschluckt zu werden.
+RPC_ERRORS = (SolanaRpcException, httpx.HTTPError)
+
+def _http_status_error(exc: BaseException) -> Optional["httpx.HTTPStatusError"]:
+    """Sucht in der Exception-Kette (SolanaRpcException wrappt den httpx-Fehler) nach einem HTTP-Statusfehler."""
+    while exc is not None:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+def _retry_after_seconds(response) -> Optional[float]:
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+# --- Hauptlogik ---
+def make_amount_formatter(decimals: int):
+    """Formatiert Token-Mengen passend zu den Dezimalstellen des Mints (einmal pro Lauf erzeugt)."""
+    if decimals > 0:
+        return ("{:." + str(decimals) + "f}").format
+    return lambda v: str(int(v))
+
+def run_standard_mode(client, payer_keypair, mint_pubkey, decimals, wallets, min_amount, max_amount, amount_fmt):
     if len(wallets) < 2:
-        logger.warning(f"Nicht genügend Wallets ({len(wallets)}) im Pool für einen Transfer.")
+        logger.warning("Nicht genügend Wallets (%d) im Pool für einen Transfer.", len(wallets))
         return
 
-    logger.info(f"Führe Transaktion innerhalb des Netzwerks mit {len(wallets)} Wallets durch...")
+    logger.info("Führe Transaktion innerhalb des Netzwerks mit %d Wallets durch...", len(wallets))
 
-    sender_kp = random.choice(wallets)
-    possible_recipients = [w for w in wallets if w.pubkey() != sender_kp.pubkey()]
-    if not possible_recipients:
-        logger.warning(f"Kein gültiger Empfänger für Sender {truncate_address(str(sender_kp.pubkey()))} gefunden.")
+    # Empfänger per Index ziehen und dabei den Sender-Index überspringen (keine Kopie des Pools).
+    sender_idx = random.randrange(len(wallets))
+    sender_kp = wallets[sender_idx]
+    j = random.randrange(len(wallets) - 1)
+    recipient_kp = wallets[j] if j < sender_idx else wallets[j + 1]
+    if recipient_kp.pubkey() == sender_kp.pubkey():
+        logger.warning("Kein gültiger Empfänger für Sender %s gefunden.", short_address(sender_kp.pubkey()))
         return
-    recipient_kp = random.choice(possible_recipients)
     
     sender_balance = get_token_balance(client, sender_kp.pubkey(), mint_pubkey)
 
     if sender_balance is None or sender_balance <= 0:
-        logger.warning(f"Sender {truncate_address(str(sender_kp.pubkey()))} hat keinen positiven Kontostand ({sender_balance if sender_balance is not None else 'Fehler'}). Überspringe.")
+        logger.warning("Sender %s hat keinen positiven Kontostand (%s). Überspringe.", short_address(sender_kp.pubkey()), sender_balance if sender_balance is not None else 'Fehler')
         return
 
     actual_max_amount = min(max_amount, sender_balance)
     if actual_max_amount < min_amount:
-        # Use f-string formatting for decimals if decimals > 0
-        balance_str = f"{sender_balance:.{decimals}f}" if decimals > 0 else str(int(sender_balance))
-        min_amount_str = f"{min_amount:.{decimals}f}" if decimals > 0 else str(int(min_amount))
-        logger.warning(f"Sender {truncate_address(str(sender_kp.pubkey()))} hat nicht genug Guthaben ({balance_str}) für Mindestüberweisung ({min_amount_str}).")
+        logger.warning("Sender %s hat nicht genug Guthaben (%s) für Mindestüberweisung (%s).", short_address(sender_kp.pubkey()), amount_fmt(sender_balance), amount_fmt(min_amount))
         return
     
     random_amount = random.uniform(min_amount, actual_max_amount)
     random_amount_raw = int(random_amount * (10**decimals))
 
-    amount_str = f"{random_amount:.{decimals}f}" if decimals > 0 else str(int(random_amount))
-    logger.info(f"NETZWERK-HANDEL: Sende {amount_str} Tokens von {truncate_address(str(sender_kp.pubkey()))} an {truncate_address(str(recipient_kp.pubkey()))}...")
+    logger.info("NETZWERK-HANDEL: Sende %s Tokens von %s an %s...", amount_fmt(random_amount), short_address(sender_kp.pubkey()), short_address(recipient_kp.pubkey()))
 
     try:
         sol_balance_resp = client.get_balance(sender_kp.pubkey(), commitment=Commitment("confirmed"))
         if sol_balance_resp.value < 5000: 
-             logger.info(f"Lade Sender-Wallet {truncate_address(str(sender_kp.pubkey()))} mit SOL auf (aktuell: {sol_balance_resp.value} Lamports).")
+             logger.info("Lade Sender-Wallet %s mit SOL auf (aktuell: %d Lamports).", short_address(sender_kp.pubkey()), sol_balance_resp.value)
              fund_with_sol(client, payer_keypair, sender_kp.pubkey()) 
              time.sleep(10)
 
         signature = send_token_transfer(client, payer_keypair, sender_kp, recipient_kp.pubkey(), mint_pubkey, random_amount_raw, decimals)
         if signature:
-            logger.info(f"✅ ERFOLG! Transaktion im Netzwerk gesendet. Signatur: {signature}")
+            logger.info("✅ ERFOLG! Transaktion im Netzwerk gesendet. Signatur: %s", signature)
+    except RPC_ERRORS:
+        raise
     except Exception as e:
-        logger.error(f"Fehler bei Netzwerk-Transfer von {truncate_address(str(sender_kp.pubkey()))} zu {truncate_address(str(recipient_kp.pubkey()))}: {e}", exc_info=True)
+        logger.error("Fehler bei Netzwerk-Transfer von %s zu %s: %s", short_address(sender_kp.pubkey()), short_address(recipient_kp.pubkey()), e, exc_info=True)
 
-def run_outside_mode(client, payer_keypair, mint_pubkey, decimals, initial_wallets, args, outside_network_wallets):
+def run_outside_mode(client, payer_keypair, mint_pubkey, decimals, initial_wallets, args, outside_network_wallets, amount_fmt):
     if outside_network_wallets and len(outside_network_wallets) >= 2 and random.random() > 0.3:
-        logger.info(f"Führe Standard-Modus innerhalb des 'outside_network_wallets' Pools ({len(outside_network_wallets)} Wallets) durch.")
-        run_standard_mode(client, payer_keypair, mint_pubkey, decimals, outside_network_wallets, args.min, args.max)
+        logger.info("Führe Standard-Modus innerhalb des 'outside_network_wallets' Pools (%d Wallets) durch.", len(outside_network_wallets))
+        run_standard_mode(client, payer_keypair, mint_pubkey, decimals, outside_network_wallets, args.min, args.max, amount_fmt)
         return
 
-    logger.info(f"Starte neuen Outside-Durchlauf: {args.outside} Hops und dann Verzweigung.")
+    logger.info("Starte neuen Outside-Durchlauf: %d Hops und dann Verzweigung.", args.outside)
     
     if not initial_wallets:
         logger.error("OUTSIDE: Keine initialen Wallets zum Starten des Outside-Modus vorhanden.")
@@ -359,12 +567,9 @@ def run_outside_mode(client, payer_keypair, mint_pubkey, decimals, initial_walle
         
     sender_kp = random.choice(initial_wallets)
     sender_balance = get_token_balance(client, sender_kp.pubkey(), mint_pubkey)
-    
-    sender_balance_str = f"{sender_balance or 0.0:.{decimals}f}" if decimals > 0 else str(int(sender_balance or 0.0))
-    min_amount_str = f"{args.min:.{decimals}f}" if decimals > 0 else str(int(args.min))
 
     if sender_balance is None or sender_balance < args.min:
-        logger.warning(f"OUTSIDE: Initialer Sender {truncate_address(str(sender_kp.pubkey()))} hat nicht genug Guthaben ({sender_balance_str} < {min_amount_str}). Überspringe Runde.")
+        logger.warning("OUTSIDE: Initialer Sender %s hat nicht genug Guthaben (%s < %s). Überspringe Runde.", short_address(sender_kp.pubkey()), amount_fmt(sender_balance or 0.0), amount_fmt(args.min))
         return
 
     min_transfer_fraction = 0.5 
@@ -375,40 +580,38 @@ def run_outside_mode(client, payer_keypair, mint_pubkey, decimals, initial_walle
     transfer_amount = min(transfer_amount, sender_balance) 
 
     if transfer_amount < args.min : 
-        transfer_amount_str = f"{transfer_amount:.{decimals}f}" if decimals > 0 else str(int(transfer_amount))
-        logger.warning(f"OUTSIDE: Berechnete Transfermenge {transfer_amount_str} für {truncate_address(str(sender_kp.pubkey()))} ist unter Minimum {min_amount_str}. Überspringe.")
+        logger.warning("OUTSIDE: Berechnete Transfermenge %s für %s ist unter Minimum %s. Überspringe.", amount_fmt(transfer_amount), short_address(sender_kp.pubkey()), amount_fmt(args.min))
         return
 
     transfer_amount_raw = int(transfer_amount * (10**decimals))
+    transfer_amount_str = amount_fmt(transfer_amount)
     
     current_sender_kp = sender_kp
     
     try:
         for i in range(1, args.outside + 1):
             hop_num = i
-            logger.info(f"--- Hop {hop_num}/{args.outside} ---")
+            logger.info("--- Hop %d/%d ---", hop_num, args.outside)
             
             new_recipient_kp = create_and_save_keypair(layer=hop_num)
-            fund_with_sol(client, payer_keypair, new_recipient_kp.pubkey(), sol_amount=0.005) 
-            time.sleep(10) 
             
-            current_amount_str = f"{transfer_amount:.{decimals}f}" if decimals > 0 else str(int(transfer_amount))
-            logger.info(f"OUTSIDE Hop {hop_num-1} ({truncate_address(str(current_sender_kp.pubkey()))}) -> Hop {hop_num} ({truncate_address(str(new_recipient_kp.pubkey()))}): Sende {current_amount_str} Tokens...")
+            logger.info("OUTSIDE Hop %d (%s) -> Hop %d (%s): Sende %s Tokens...", hop_num - 1, short_address(current_sender_kp.pubkey()), hop_num, short_address(new_recipient_kp.pubkey()), transfer_amount_str)
             
-            signature = send_token_transfer(client, payer_keypair, current_sender_kp, new_recipient_kp.pubkey(), mint_pubkey, transfer_amount_raw, decimals)
-            logger.info(f"✅ HOP {hop_num} ERFOLGREICH! Signatur: {signature}")
+            # Token-Transfer und SOL-Aufladung (0.005 SOL) des neuen Wallets in einer Transaktion;
+            # das ATA eines gerade erzeugten Keypairs kann noch nicht existieren.
+            signature = send_token_transfer(client, payer_keypair, current_sender_kp, new_recipient_kp.pubkey(), mint_pubkey, transfer_amount_raw, decimals, recipient_ata_exists=False, sol_fund_lamports=int(0.005 * 1_000_000_000))
+            logger.info("✅ HOP %d ERFOLGREICH! Signatur: %s", hop_num, signature)
 
             current_sender_kp = new_recipient_kp 
             time.sleep(args.delay if args.delay > 5 else 7) 
 
         distributor_kp = current_sender_kp
-        logger.info(f"Alle {args.outside} Hops abgeschlossen. Verteiler-Wallet: {truncate_address(str(distributor_kp.pubkey()))}")
+        logger.info("Alle %d Hops abgeschlossen. Verteiler-Wallet: %s", args.outside, short_address(distributor_kp.pubkey()))
         logger.info("Starte Verzweigungsphase...")
 
         distributor_balance = get_token_balance(client, distributor_kp.pubkey(), mint_pubkey)
-        dist_balance_str = f"{distributor_balance or 0.0:.{decimals}f}" if decimals > 0 else str(int(distributor_balance or 0.0))
         if distributor_balance is None or distributor_balance <= 0.000001: 
-            logger.error(f"Verteiler-Wallet {truncate_address(str(distributor_kp.pubkey()))} hat kein Guthaben ({dist_balance_str}) für die Verzweigung.")
+            logger.error("Verteiler-Wallet %s hat kein Guthaben (%s) für die Verzweigung.", short_address(distributor_kp.pubkey()), amount_fmt(distributor_balance or 0.0))
             return
 
         network_size = args.network_size if args.network_size > 0 else random.randint(2, 4)
@@ -416,56 +619,79 @@ def run_outside_mode(client, payer_keypair, mint_pubkey, decimals, initial_walle
         
         sol_per_branch_ata_creation = 0.0021 
         funding_amount_sol = network_size * sol_per_branch_ata_creation
-        logger.info(f"Lade Verteiler-Wallet {truncate_address(str(distributor_kp.pubkey()))} für {network_size} Zweige mit {funding_amount_sol:.4f} SOL auf...")
+        logger.info("Lade Verteiler-Wallet %s für %d Zweige mit %.4f SOL auf...", short_address(distributor_kp.pubkey()), network_size, funding_amount_sol)
         fund_with_sol(client, payer_keypair, distributor_kp.pubkey(), sol_amount=funding_amount_sol)
         time.sleep(10) 
 
         amount_per_branch = distributor_balance / network_size
-        amount_per_branch_str = f"{amount_per_branch:.{decimals}f}" if decimals > 0 else str(int(amount_per_branch))
+        branch_amount_str = amount_fmt(amount_per_branch)
         
         # Compare amount_per_branch with args.min, not args.min / (10**decimals)
         if amount_per_branch < args.min and amount_per_branch > 0: 
-             logger.warning(f"Betrag pro Zweig ({amount_per_branch_str}) ist sehr klein im Vergleich zum Minimum von {args.min}. Erwägen Sie eine Reduzierung der Netzwerkgröße oder mehr Token im Verteiler.")
+             logger.warning("Betrag pro Zweig (%s) ist sehr klein im Vergleich zum Minimum von %s. Erwägen Sie eine Reduzierung der Netzwerkgröße oder mehr Token im Verteiler.", branch_amount_str, args.min)
         
         amount_per_branch_raw = int(amount_per_branch * (10**decimals))
         if amount_per_branch_raw <= 0:
-            logger.error(f"Verteiler-Wallet {truncate_address(str(distributor_kp.pubkey()))} hat nicht genug Token ({dist_balance_str}) für {network_size} Zweige. Betrag pro Zweig wäre <= 0.")
+            logger.error("Verteiler-Wallet %s hat nicht genug Token (%s) für %d Zweige. Betrag pro Zweig wäre <= 0.", short_address(distributor_kp.pubkey()), amount_fmt(distributor_balance), network_size)
             return
 
         trading_layer = args.outside + 1 
         newly_created_wallets_for_pool = []
-
-        for i in range(network_size):
-            logger.info(f"Erstelle Zweig {i+1}/{network_size}...")
-            branch_wallet_kp = create_and_save_keypair(layer=trading_layer)
-            
-            branch_amount_str = f"{amount_per_branch:.{decimals}f}" if decimals > 0 else str(int(amount_per_branch))
-            logger.info(f"Überweise {branch_amount_str} Tokens an Zweig {i+1} ({truncate_address(str(branch_wallet_kp.pubkey()))})...")
-            signature = send_token_transfer(client, payer_keypair, distributor_kp, branch_wallet_kp.pubkey(), mint_pubkey, amount_per_branch_raw, decimals)
-            
-            if signature:
-                logger.info(f"✅ Zweig {i+1} erfolgreich erstellt. Signatur: {signature}")
-                newly_created_wallets_for_pool.append(branch_wallet_kp)
-                fund_with_sol(client, payer_keypair, branch_wallet_kp.pubkey(), sol_amount=0.003) 
-                time.sleep(args.delay if args.delay > 5 else 7) 
-            else:
-                logger.error(f"Fehler bei der Erstellung von Zweig {i+1} (Token-Transfer fehlgeschlagen).")
+        # Frisch erzeugte Zweig-Wallets haben noch kein ATA: keine Existenzabfrage nötig.
+        branch_wallets = [create_and_save_keypair(layer=trading_layer) for _ in range(network_size)]
+
+        # Die Zweige sind voneinander unabhängig (im Gegensatz zur Hop-Kette): die Transfers
+        # (inkl. SOL-Aufladung von 0.003 SOL) laufen parallel, begrenzt durch --max-parallel (RPC-Ratenlimit).
+        workers = max(1, min(args.max_parallel, network_size))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="branch") as pool:
+            transfer_futures = []
+            for i, branch_wallet_kp in enumerate(branch_wallets):
+                logger.info("Überweise %s Tokens an Zweig %d/%d (%s)...", branch_amount_str, i + 1, network_size, short_address(branch_wallet_kp.pubkey()))
+                transfer_futures.append(pool.submit(send_token_transfer, client, payer_keypair, distributor_kp, branch_wallet_kp.pubkey(), mint_pubkey, amount_per_branch_raw, decimals, False, int(0.003 * 1_000_000_000)))
+
+            rpc_error = None
+            for i, (branch_wallet_kp, future) in enumerate(zip(branch_wallets, transfer_futures)):
+                try:
+                    signature = future.result()
+                except RPC_ERRORS as e:
+                    logger.error("RPC-Fehler bei der Erstellung von Zweig %d: %s", i + 1, e)
+                    rpc_error = rpc_error or e
+                    continue
+                except Exception as e:
+                    logger.error("Fehler bei der Erstellung von Zweig %d: %s", i + 1, e, exc_info=True)
+                    continue
+                if signature:
+                    logger.info("✅ Zweig %d erfolgreich erstellt. Signatur: %s", i + 1, signature)
+                    newly_created_wallets_for_pool.append(branch_wallet_kp)
+                else:
+                    logger.error("Fehler bei der Erstellung von Zweig %d (Token-Transfer fehlgeschlagen).", i + 1)
+
+        if newly_created_wallets_for_pool:
+            time.sleep(args.delay if args.delay > 5 else 7)
 
         outside_network_wallets.extend(newly_created_wallets_for_pool)
-        logger.info(f"{len(newly_created_wallets_for_pool)} neue Wallets zum externen Handelspool hinzugefügt.")
+        logger.info("%d neue Wallets zum externen Handelspool hinzugefügt.", len(newly_created_wallets_for_pool))
+        # Erst nach dem Übernehmen der erfolgreichen Zweige melden, damit die Hauptschleife zurückfährt.
+        if rpc_error is not None:
+            raise rpc_error
 
+    except RPC_ERRORS:
+        raise
     except Exception as e:
-        logger.error(f"Fehler während des Outside-Modus: {e}", exc_info=True)
+        logger.error("Fehler während des Outside-Modus: %s", e, exc_info=True)
 
 # ... (alle imports und Funktionen bis main) ...
 
 def main(args):
+    global PRIORITY_FEE_MICRO_LAMPORTS
+    PRIORITY_FEE_MICRO_LAMPORTS = args.priority_fee
+
     try:
         payer_path = os.path.join(CONFIG_WALLET_FOLDER, "payer-wallet.json")
         mint_path = os.path.join(CONFIG_WALLET_FOLDER, "mint-wallet.json")
         
         if not os.path.exists(payer_path) or not os.path.exists(mint_path):
-             logger.error(f"Kritischer Fehler: 'payer-wallet.json' oder 'mint-wallet.json' nicht im Ordner '{CONFIG_WALLET_FOLDER}' gefunden.")
+             logger.error("Kritischer Fehler: 'payer-wallet.json' oder 'mint-wallet.json' nicht im Ordner '%s' gefunden.", CONFIG_WALLET_FOLDER)
              sys.exit(1)
 
         payer_keypair = load_keypair_from_path(payer_path)
@@ -473,17 +699,19 @@ def main(args):
         initial_wallets = load_all_keypairs(WALLET_SOURCE_FOLDER)
         initial_wallets = [w for w in initial_wallets if w.pubkey() not in [payer_keypair.pubkey(), mint_pubkey]]
     except Exception as e:
-        logger.error(f"Kritischer Fehler beim Laden der Start-Wallets: {e}", exc_info=True)
+        logger.error("Kritischer Fehler beim Laden der Start-Wallets: %s", e, exc_info=True)
         sys.exit(1)
 
     if not initial_wallets:
-        logger.error(f"Keine operativen Wallets im '{WALLET_SOURCE_FOLDER}'-Ordner gefunden (nach Filterung von Payer/Mint).")
+        logger.error("Keine operativen Wallets im '%s'-Ordner gefunden (nach Filterung von Payer/Mint).", WALLET_SOURCE_FOLDER)
         sys.exit(1)
 
-    # MODIFIED for solana==0.36.6:
-    # Initialize Client without httpx_client_kwargs or a direct timeout in constructor
-    logger.info(f"Initialisiere RPC Client für {RPC_URL} (solana-py 0.36.6 verwendet Standard-HTTP-Timeouts)")
-    client = Client(RPC_URL) 
+    # solana-py 0.36.6 nimmt keine httpx-Parameter im Konstruktor entgegen; die eigene Session
+    # (Keep-Alive, 30s Timeout, HTTP/2 falls h2 installiert) wird daher direkt im Provider gesetzt.
+    http_session = create_http_session()
+    logger.info("Initialisiere RPC Client für %s (HTTP/2: %s)", RPC_URL, "ja" if HTTP2_AVAILABLE and CONFIG.get('rpc_http2', True) else "nein")
+    client = Client(RPC_URL)
+    client._provider.session = http_session
     
     decimals = 0 # Default, will be updated
     try:
@@ -491,95 +719,110 @@ def main(args):
         token_supply_resp = client.get_token_supply(mint_pubkey, commitment=Commitment("confirmed"))
         decimals = token_supply_resp.value.decimals
     except Exception as e:
-        logger.error(f"Konnte Token-Informationen für Mint {mint_pubkey} nicht abrufen: {e}", exc_info=True)
+        logger.error("Konnte Token-Informationen für Mint %s nicht abrufen: %s", mint_pubkey, e, exc_info=True)
         logger.error("Konnte Dezimalstellen nicht ermitteln. Das Skript kann nicht fortfahren.")
         sys.exit(1)
 
+    amount_fmt = make_amount_formatter(decimals)
 
-    logger.info(f"{len(initial_wallets)} initiale Wallets geladen. Starte Traffic-Generierung...")
-    logger.info(f"Payer: {payer_keypair.pubkey()}")
-    logger.info(f"Token Mint: {mint_pubkey} (Dezimalstellen: {decimals})")
+    logger.info("%d initiale Wallets geladen. Starte Traffic-Generierung...", len(initial_wallets))
+    logger.info("Payer: %s", payer_keypair.pubkey())
+    logger.info("Token Mint: %s (Dezimalstellen: %d)", mint_pubkey, decimals)
+    logger.info("Prioritätsgebühr: %s Micro-Lamports pro CU", PRIORITY_FEE_MICRO_LAMPORTS)
 
     if args.outside > 0:
-        logger.info(f"Modus: --outside aktiviert mit {args.outside} Hops.")
+        logger.info("Modus: --outside aktiviert mit %d Hops.", args.outside)
         if args.network_size > 0: 
-            logger.info(f"Netzwerkgröße pro Verzweigung: {args.network_size}")
+            logger.info("Netzwerkgröße pro Verzweigung: %d", args.network_size)
         else: 
-            logger.info(f"Netzwerkgröße pro Verzweigung: zufällig (2-4)")
+            logger.info("Netzwerkgröße pro Verzweigung: zufällig (2-4)")
     
     outside_network_wallets = [] 
     if args.outside > 0:
         trading_layer = args.outside + 1
         trading_network_folder = os.path.join(GENERATED_WALLET_FOLDER, f"layer_{trading_layer}")
         if os.path.exists(trading_network_folder):
-            logger.info(f"Lade existierende Wallets aus dem Handelsnetzwerk-Ordner: '{trading_network_folder}'")
+            logger.info("Lade existierende Wallets aus dem Handelsnetzwerk-Ordner: '%s'", trading_network_folder)
             loaded_trading_wallets = load_all_keypairs(trading_network_folder)
             
             verified_wallets = []
             if loaded_trading_wallets:
-                logger.info(f"{len(loaded_trading_wallets)} potenzielle Wallets aus '{trading_network_folder}' geladen. Überprüfe Guthaben...")
+                logger.info("%d potenzielle Wallets aus '%s' geladen. Überprüfe Guthaben...", len(loaded_trading_wallets), trading_network_folder)
+                try:
+                    balances = fetch_wallet_balances(client, [w.pubkey() for w in loaded_trading_wallets], mint_pubkey, decimals)
+                except Exception as e:
+                    logger.warning("Fehler beim Überprüfen der Handelsnetzwerk-Wallets: %s. Starte ohne bestehendes Netzwerk.", e)
+                    balances = {}
                 for wallet_kp in loaded_trading_wallets:
-                    try:
-                        sol_bal = client.get_balance(wallet_kp.pubkey(), commitment=Commitment("confirmed")).value
-                        token_bal = get_token_balance(client, wallet_kp.pubkey(), mint_pubkey)
-                        
-                        token_bal_str = f"{token_bal:.{decimals}f}" if decimals > 0 and token_bal is not None else str(int(token_bal or 0))
-
-                        if token_bal is not None and token_bal > 0 and sol_bal > 10000: 
-                            logger.info(f"Aktives Wallet {truncate_address(str(wallet_kp.pubkey()))} mit {token_bal_str} Tokens und {sol_bal} Lamports gefunden.")
-                            verified_wallets.append(wallet_kp)
-                        else:
-                            logger.debug(f"Wallet {truncate_address(str(wallet_kp.pubkey()))} hat unzureichendes Guthaben (Tokens: {token_bal_str}, SOL: {sol_bal}).")
-                    except Exception as e:
-                        logger.warning(f"Fehler beim Überprüfen von Wallet {truncate_address(str(wallet_kp.pubkey()))}: {e}. Wird ignoriert.")
+                    if wallet_kp.pubkey() not in balances:
+                        continue
+                    token_bal, sol_bal = balances[wallet_kp.pubkey()]
+                    token_bal_str = amount_fmt(token_bal)
+
+                    if token_bal > 0 and sol_bal > 10000: 
+                        logger.info("Aktives Wallet %s mit %s Tokens und %s Lamports gefunden.", short_address(wallet_kp.pubkey()), token_bal_str, sol_bal)
+                        verified_wallets.append(wallet_kp)
+                    else:
+                        logger.debug("Wallet %s hat unzureichendes Guthaben (Tokens: %s, SOL: %s).", short_address(wallet_kp.pubkey()), token_bal_str, sol_bal)
             
             outside_network_wallets = verified_wallets
             if outside_network_wallets:
-                 logger.info(f"{len(outside_network_wallets)} aktive Wallets im Handelsnetzwerk initialisiert.")
+                 logger.info("%d aktive Wallets im Handelsnetzwerk initialisiert.", len(outside_network_wallets))
             else:
                  logger.info("Keine aktiven Wallets im bestehenden Handelsnetzwerk gefunden.")
 
+    backoff = Backoff(args.delay, args.min_delay if args.min_delay is not None else args.delay)
     loop_count = 0
     while True:
         loop_count += 1
-        logger.info(f"--- Starte Aktionszyklus {loop_count} ---")
+        logger.info("--- Starte Aktionszyklus %d ---", loop_count)
         try:
             if args.outside > 0:
-                run_outside_mode(client, payer_keypair, mint_pubkey, decimals, initial_wallets, args, outside_network_wallets)
+                run_outside_mode(client, payer_keypair, mint_pubkey, decimals, initial_wallets, args, outside_network_wallets, amount_fmt)
             else: 
                 if len(initial_wallets) < 2:
                     logger.error("Für den Standardmodus werden mindestens 2 Wallets im Quellordner benötigt.")
                     break 
-                run_standard_mode(client, payer_keypair, mint_pubkey, decimals, initial_wallets, args.min, args.max)
+                run_standard_mode(client, payer_keypair, mint_pubkey, decimals, initial_wallets, args.min, args.max, amount_fmt)
             
-            logger.info(f"Aktionszyklus {loop_count} beendet. Warte {args.delay} Sekunden bis zur nächsten Aktion...")
-            time.sleep(args.delay)
+            backoff.success()
+            logger.info("Aktionszyklus %d beendet. Warte ca. %.0f Sekunden bis zur nächsten Aktion...", loop_count, backoff.delay)
+            backoff.sleep()
 
         except KeyboardInterrupt:
             logger.info("Skript wird durch Benutzer beendet.")
             sys.exit(0)
-        except SolanaRpcException as e: 
+        except RPC_ERRORS as e: 
+            status_error = _http_status_error(e)
+            retry_after = _retry_after_seconds(status_error.response) if status_error is not None else None
+            if status_error is not None and status_error.response.status_code == 429:
+                logger.warning("RPC-Ratenlimit (429) im Hauptzyklus erreicht%s.", ", Retry-After: %.0fs" % retry_after if retry_after else "")
+                backoff.failure(retry_after=retry_after)
             # Check if the error message indicates a timeout, which is more likely without explicit timeout control
-            if "timed out" in str(e).lower() or "timeout" in str(e).lower():
-                logger.error(f"Solana RPC Timeout im Hauptzyklus: {e}", exc_info=False) # exc_info=False for cleaner timeout log
-                logger.info("RPC Timeout. Warte 90 Sekunden und versuche es erneut...")
-                time.sleep(90) # Longer wait for timeouts
+            elif isinstance(e.__cause__ or e, httpx.TimeoutException) or "timed out" in str(e).lower() or "timeout" in str(e).lower():
+                logger.error("Solana RPC Timeout im Hauptzyklus: %s", e, exc_info=False) # exc_info=False for cleaner timeout log
+                backoff.failure(floor=90) # Longer wait for timeouts
             else:
-                logger.error(f"Solana RPC Fehler im Hauptzyklus: {e}", exc_info=True)
-                logger.info("Warte 60 Sekunden und versuche es erneut...")
-                time.sleep(60)
+                logger.error("Solana RPC Fehler im Hauptzyklus: %s", e, exc_info=True)
+                backoff.failure(floor=60)
+            logger.info("Warte ca. %.0f Sekunden und versuche es erneut...", backoff.delay)
+            backoff.sleep(minimum=retry_after)
         except Exception as e: 
-            logger.error(f"Ein unerwarteter Hauptfehler ist aufgetreten: {e}", exc_info=True)
-            logger.info("Warte 30 Sekunden und versuche es erneut...")
-            time.sleep(30)
+            logger.error("Ein unerwarteter Hauptfehler ist aufgetreten: %s", e, exc_info=True)
+            backoff.failure(floor=30)
+            logger.info("Warte ca. %.0f Sekunden und versuche es erneut...", backoff.delay)
+            backoff.sleep()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Solana Advanced Traffic Generator.")
     parser.add_argument("--delay", type=int, default=7, help="Verzögerung in Sekunden zwischen den Aktionen (Standard: 7).")
+    parser.add_argument("--min-delay", type=int, default=None, help="Untergrenze, auf die die Pause nach erfolgreichen Zyklen sinken darf (Standard: gleich --delay).")
     parser.add_argument("--min", type=float, default=1.0, help="Mindestmenge an Tokens pro Transfer (Standard: 1.0).")
     parser.add_argument("--max", type=float, default=100.0, help="Höchstmenge an Tokens pro Transfer (Standard: 100.0).")
     parser.add_argument("--outside", type=int, default=0, help="Aktiviert den 'Outside'-Modus. Gibt die Anzahl der Hops an (0 deaktiviert).")
     parser.add_argument("--network-size", type=int, default=0, help="Feste Anzahl der Wallets im neuen Handelsnetzwerk nach Verzweigung. (Standard: zufällig 2-4, wenn 0 angegeben)")
+    parser.add_argument("--priority-fee", type=int, default=10_000, help="Prioritätsgebühr in Micro-Lamports pro Compute Unit (Standard: 10000, 0 deaktiviert).")
+    parser.add_argument("--max-parallel", type=int, default=15, help="Maximale Anzahl parallel gesendeter Transaktionen in der Verzweigungsphase (Standard: 15).")
     
     args = parser.parse_args()
 
@@ -589,11 +832,20 @@ if __name__ == "__main__":
     if args.delay < 0:
         print("Fehler: --delay darf nicht negativ sein.")
         sys.exit(1)
+    if args.min_delay is not None and (args.min_delay < 0 or args.min_delay > args.delay):
+        print("Fehler: --min-delay darf nicht negativ und nicht größer als --delay sein.")
+        sys.exit(1)
     if args.outside < 0:
         print("Fehler: --outside darf nicht negativ sein.")
         sys.exit(1)
     if args.network_size < 0:
         print("Fehler: --network-size darf nicht negativ sein.")
         sys.exit(1)
+    if args.priority_fee < 0:
+        print("Fehler: --priority-fee darf nicht negativ sein.")
+        sys.exit(1)
+    if args.max_parallel < 1:
+        print("Fehler: --max-parallel muss mindestens 1 sein.")
+        sys.exit(1)
         
     main(args)
@@ -17,6 +17,7 @@ import asyncio
 import logging
 import webbrowser
 from collections import deque, defaultdict
+from itertools import chain
 from datetime import datetime
 from typing import Dict, Set, Optional
 
@@ -314,7 +315,7 @@ class WhitelistMonitorBot:
         
         has_mint_in_balances = any(
             hasattr(b, 'mint') and isinstance(b.mint, Pubkey) and b.mint == self.mint_pubkey
-            for b in (getattr(tx_meta, 'pre_token_balances', []) or []) + (getattr(tx_meta, 'post_token_balances', []) or [])
+            for b in chain(getattr(tx_meta, 'post_token_balances', None) or (), getattr(tx_meta, 'pre_token_balances', None) or ())
         )
         if self.debug_mode: self.log_func(f"DEBUG: has_mint_in_balances: {has_mint_in_balances} für {signature_str}", "debug")
         if self.debug_mode and not has_mint_in_balances: 
@@ -380,7 +381,7 @@ class WhitelistMonitorBot:
 
             balance_changes = {}
             pre_balances, post_balances = getattr(tx_meta, 'pre_token_balances', []) or [], getattr(tx_meta, 'post_token_balances', []) or []
-            for balance_obj in (pre_balances + post_balances):
+            for balance_obj in chain(pre_balances, post_balances):
                 if hasattr(balance_obj, 'mint') and isinstance(balance_obj.mint, Pubkey) and balance_obj.mint == self.mint_pubkey:
                     if not hasattr(balance_obj, 'owner') or not hasattr(balance_obj, 'account_index'):
                         self.log_func(f"WARNUNG: Unvollständiges Balance-Objekt in {signature_str}: {balance_obj}", "warning"); continue
@@ -450,6 +451,19 @@ class WhitelistMonitorBot:
             if self.debug_mode: import traceback; self.log_func(traceback.format_exc(), "debug") 
             return False
 
+    def _tx_ata_owners(self, tx_response_value, account_keys) -> dict:
+        """ATA -> Owner für unseren Mint aus den Pre-/Post-TokenBalances einer Transaktion."""
+        all_token_balances = chain(getattr(tx_response_value.transaction.meta, 'pre_token_balances', None) or (),
+                                   getattr(tx_response_value.transaction.meta, 'post_token_balances', None) or ())
+        account_keys_str = [str(k) for k in account_keys]
+        ata_to_owner = {}
+        for tb in all_token_balances:
+            if hasattr(tb, 'account_index') and hasattr(tb, 'owner') and hasattr(tb, 'mint') and \
+               isinstance(tb.mint, Pubkey) and tb.mint == self.mint_pubkey and \
+               tb.account_index < len(account_keys_str):
+                ata_to_owner.setdefault(account_keys_str[tb.account_index], str(tb.owner))
+        return ata_to_owner
+
     async def _log_freeze_thaw_if_present(self, tx_response_value, signature_str: str) -> bool: # Parameter umbenannt
         if self.debug_mode: self.log_func(f"DEBUG: _log_freeze_thaw_if_present für {signature_str}", "debug")
         
@@ -468,6 +482,9 @@ class WhitelistMonitorBot:
         if not account_keys:
             return False
 
+        # ATA -> Owner wird erst beim ersten Freeze/Thaw unseres Mints aus den TokenBalances aufgebaut.
+        ata_to_owner = None
+
         if self.debug_mode: self.log_func(f"DEBUG (Freeze/Thaw Check - TX: {signature_str}): Anzahl Instruktionen: {len(instructions_list)}", "debug")
 
         for instruction_idx, instruction_obj in enumerate(instructions_list): 
@@ -531,18 +548,10 @@ class WhitelistMonitorBot:
                 if self.debug_mode: self.log_func(f"DEBUG (Freeze/Thaw Check - TX: {signature_str}, Idx: {instruction_idx}): Kein 'account' (ATA) in parsed info. Info: {json.dumps(parsed_instr_info_dict)}", "debug")
                 continue
 
-            wallet_owner_address_str = None
-            # <<< KORREKTUR: Zugriff auf tx_meta hier nicht mehr direkt möglich, stattdessen tx_response_value verwenden >>>
-            all_token_balances = (getattr(tx_response_value.transaction.meta, 'pre_token_balances', []) or []) + \
-                                 (getattr(tx_response_value.transaction.meta, 'post_token_balances', []) or [])
-            for tb_idx, tb in enumerate(all_token_balances):
-                if hasattr(tb, 'account_index') and hasattr(tb, 'owner') and hasattr(tb, 'mint') and \
-                   isinstance(tb.mint, Pubkey) and tb.mint == self.mint_pubkey and \
-                   tb.account_index < len(account_keys): 
-                    if str(account_keys[tb.account_index]) == ata_address_str:
-                        wallet_owner_address_str = str(tb.owner)
-                        if self.debug_mode: self.log_func(f"DEBUG (Freeze/Thaw Check - TX: {signature_str}, Idx: {instruction_idx}): Owner {wallet_owner_address_str} für ATA {ata_address_str} via TokenBalance Idx {tb_idx} gefunden.", "debug")
-                        break 
+            if ata_to_owner is None: ata_to_owner = self._tx_ata_owners(tx_response_value, account_keys)
+            wallet_owner_address_str = ata_to_owner.get(ata_address_str)
+            if wallet_owner_address_str and self.debug_mode:
+                self.log_func(f"DEBUG (Freeze/Thaw Check - TX: {signature_str}, Idx: {instruction_idx}): Owner {wallet_owner_address_str} für ATA {ata_address_str} via TokenBalances gefunden.", "debug")
             
             if not wallet_owner_address_str:
                 self.log_func(f"WARNUNG (Freeze/Thaw Check - TX: {signature_str}, Idx: {instruction_idx}): Owner für ATA {ata_address_str} nicht in TokenBalances. Versuche RPC-Lookup...", "warning")